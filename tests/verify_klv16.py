@@ -3,38 +3,48 @@
 Verify KLV16 conversion by comparing against original KLV2 file.
 """
 
+import mmap
+import os
 import struct
 import sys
+from array import array
+from contextlib import nullcontext
+from itertools import compress, count
+from operator import ne
 
-def load_klv2(path):
-    """Load original KLV2 format (float values in points)"""
-    with open(path, 'rb') as f:
-        data = f.read()
+_U32 = struct.Struct('<I')
+
+def map_input(f):
+    """Map `f` read-only, or b'' for an empty file (which mmap rejects)"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return nullcontext(b'')
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-    offset = 0
-    kwg_size = struct.unpack_from('<I', data, offset)[0]
-    offset += 4 + kwg_size * 4
+def _load_leaves(data, typecode):
+    """Parse the KWG header and decode the little-endian leave table"""
+    kwg_size = _U32.unpack_from(data, 0)[0]
+    offset = 4 + kwg_size * 4
 
-    num_leaves = struct.unpack_from('<I', data, offset)[0]
+    num_leaves = _U32.unpack_from(data, offset)[0]
     offset += 4
 
-    leaves = struct.unpack_from(f'<{num_leaves}f', data, offset)
-    return kwg_size, list(leaves)
+    # Bulk copy straight out of the file buffer, no intermediate slice
+    leaves = array(typecode)
+    with memoryview(data) as view:
+        leaves.frombytes(view[offset:offset + num_leaves * leaves.itemsize])
+    if sys.byteorder != 'little':
+        leaves.byteswap()
+    return kwg_size, leaves
+
+def load_klv2(path):
+    """Load original KLV2 format (float values in points)"""
+    with open(path, 'rb') as f, map_input(f) as data:
+        return _load_leaves(data, 'f')
 
 def load_klv16(path):
     """Load KLV16 format (int16 values in eighths)"""
-    with open(path, 'rb') as f:
-        data = f.read()
-
-    offset = 0
-    kwg_size = struct.unpack_from('<I', data, offset)[0]
-    offset += 4 + kwg_size * 4
-
-    num_leaves = struct.unpack_from('<I', data, offset)[0]
-    offset += 4
-
-    leaves = struct.unpack_from(f'<{num_leaves}h', data, offset)
-    return kwg_size, list(leaves)
+    with open(path, 'rb') as f, map_input(f) as data:
+        return _load_leaves(data, 'h')
 
 def main():
     if len(sys.argv) != 3:
@@ -67,22 +77,23 @@ def main():
     error_count = 0
     total_error = 0
 
-    for i, (orig, conv) in enumerate(zip(leaves2, leaves16)):
-        expected = round(orig * 8)  # Convert to eighths
-
-        # Clip to int16 range
-        if expected > 32767:
-            expected = 32767
-        elif expected < -32768:
-            expected = -32768
-
-        error = abs(conv - expected)
-        if error != 0:
+    # Convert to eighths, clipping to int16 range only if anything overflows
+    expected = [round(orig * 8) for orig in leaves2]
+    if expected and (min(expected) < -32768 or max(expected) > 32767):
+        expected = [e if -32768 <= e <= 32767 else (32767 if e > 0 else -32768)
+                    for e in expected]
+    expected = array('h', expected)
+
+    # Only mismatched entries are visited in Python
+    if expected != leaves16:
+        for i in compress(count(), map(ne, expected, leaves16)):
+            conv = leaves16[i]
+            error = abs(conv - expected[i])
             error_count += 1
             total_error += error
             if error > max_error:
                 max_error = error
-                print(f"  Index {i}: orig={orig:.6f}, expected={expected}, got={conv}, error={error}")
+                print(f"  Index {i}: orig={leaves2[i]:.6f}, expected={expected[i]}, got={conv}, error={error}")
 
     print(f"\nConversion verification:")
     print(f"  Total leaves: {len(leaves2)}")
@@ -0,0 +1,19 @@
+"""
+Read-only access to binary input files for the data conversion tools.
+"""
+
+import mmap
+import os
+from contextlib import nullcontext
+
+
+def map_input(f):
+    """Map the open binary file `f` read-only, for use in a with statement.
+
+    mmap refuses zero-length files, so an empty file yields b'' instead;
+    either way the result supports len(), slicing, memoryview and
+    struct.unpack_from.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        return nullcontext(b'')
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
@@ -39,33 +39,43 @@ TEXTURE_HEIGHT = 64
 GLYPH_WIDTH = 6
 GLYPH_HEIGHT = 6
 
+# Expanded pixels (0x00/0xFF, MSB first) for every possible packed byte
+BYTE_PIXELS = [bytes(0xFF if byte & (0x80 >> i) else 0x00 for i in range(8))
+               for byte in range(256)]
+
+# Top-left texture pixel of each glyph cell, 10 cells per atlas row
+GLYPHS_PER_ROW = TEXTURE_WIDTH // GLYPH_WIDTH
+CELL_ORIGIN = [((i % GLYPHS_PER_ROW) * GLYPH_WIDTH, (i // GLYPHS_PER_ROW) * GLYPH_HEIGHT)
+               for i in range(96)]
+
+# Bit for each pixel column of a glyph row (MSB = leftmost)
+BITMASK = tuple(0x80 >> i for i in range(GLYPH_WIDTH))
+
+# Maps a pixel byte to an ASCII binary digit (any non-zero pixel is set)
+PIXEL_BITS = b'0' + b'1' * 255
+
 def decompress_font():
     """Decompress the font data into a 64x64 bitmap."""
-    texture = bytearray(TEXTURE_WIDTH * TEXTURE_HEIGHT)
+    texture_size = TEXTURE_WIDTH * TEXTURE_HEIGHT
+    data = fpf_compressed_font
+    segments = []
 
     byte_index = 0
-    pixel_index = 0
-
-    while byte_index < len(fpf_compressed_font) and pixel_index < len(texture):
-        byte = fpf_compressed_font[byte_index]
+    while byte_index < len(data):
+        byte = data[byte_index]
         byte_index += 1
 
         if byte == 0:
             # Run of zeros - next byte * 8 pixels
-            if byte_index < len(fpf_compressed_font):
-                run_length = fpf_compressed_font[byte_index] * 8
+            if byte_index < len(data):
+                segments.append(bytes(data[byte_index] * 8))
                 byte_index += 1
-                for _ in range(run_length):
-                    if pixel_index < len(texture):
-                        texture[pixel_index] = 0
-                        pixel_index += 1
         else:
             # 8 pixels encoded in this byte
-            for i in range(7, -1, -1):
-                if pixel_index < len(texture):
-                    texture[pixel_index] = 0xFF if (byte & (1 << i)) else 0x00
-                    pixel_index += 1
+            segments.append(BYTE_PIXELS[byte])
 
+    texture = bytearray(b''.join(segments)[:texture_size])
+    texture.extend(bytes(texture_size - len(texture)))
     return texture
 
 def extract_glyph(texture, char_code):
@@ -75,24 +85,15 @@ def extract_glyph(texture, char_code):
     if glyph_index < 0 or glyph_index >= 96:
         return None
 
-    glyphs_per_row = TEXTURE_WIDTH // GLYPH_WIDTH  # 10 glyphs per row
-    row = glyph_index // glyphs_per_row
-    col = glyph_index % glyphs_per_row
-
-    start_x = col * GLYPH_WIDTH
-    start_y = row * GLYPH_HEIGHT
+    start_x, start_y = CELL_ORIGIN[glyph_index]
 
-    # Extract 6 rows of 6 pixels each, convert to bytes (MSB = leftmost)
+    # Extract 6 rows of 6 pixels each, convert to bytes (MSB = leftmost).
+    # Each row slice is mapped to ASCII '0'/'1' and parsed as one integer.
     bitmap = []
     for y in range(GLYPH_HEIGHT):
-        byte_val = 0
-        for x in range(GLYPH_WIDTH):
-            px = start_x + x
-            py = start_y + y
-            if py < TEXTURE_HEIGHT and px < TEXTURE_WIDTH:
-                if texture[py * TEXTURE_WIDTH + px]:
-                    byte_val |= (0x80 >> x)
-        bitmap.append(byte_val)
+        base = (start_y + y) * TEXTURE_WIDTH + start_x
+        row = texture[base:base + GLYPH_WIDTH].translate(PIXEL_BITS)
+        bitmap.append(int(row, 2) << (8 - GLYPH_WIDTH))
 
     return bitmap
 
@@ -140,7 +141,7 @@ def generate_c_code(output_path, pad_to_8=False):
         if bitmap:
             print(f"\n{chr(char_code)}:")
             for row in bitmap:
-                print(''.join(['#' if row & (0x80 >> i) else '.' for i in range(6)]))
+                print(''.join(['#' if row & bit else '.' for bit in BITMASK]))
 
 if __name__ == '__main__':
     generate_c_code('src/font_five_pixel.c', pad_to_8=True)
@@ -3,13 +3,13 @@
 Generate an HTML font browser that renders bitmap fonts pixel-perfectly using canvas.
 """
 
-import os
-import re
 import sys
+import html
 import json
-import subprocess
+import base64
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # Use venv if available
 venv_path = Path(__file__).parent.parent / '.venv' / 'lib'
@@ -18,208 +18,13 @@ if venv_path.exists():
     for p in venv_path.glob('python*/site-packages'):
         site.addsitedir(str(p))
 
-import re
 from fontTools.ttLib import TTFont
 
+from font_extract import bdf_font_size, iter_bdf_glyphs
 
-def extract_bdf_bitmaps(font_path):
-    """Extract glyph bitmaps from a BDF font file."""
-    with open(font_path, 'r') as f:
-        content = f.read()
-
-    # Get font bounding box for default dimensions
-    bbox_match = re.search(r'FONTBOUNDINGBOX\s+(\d+)\s+(\d+)', content)
-    if bbox_match:
-        font_width = int(bbox_match.group(1))
-        font_height = int(bbox_match.group(2))
-    else:
-        font_width = 8
-        font_height = 8
-
-    glyphs = {}
-
-    # Parse each character
-    char_pattern = re.compile(
-        r'STARTCHAR\s+\S+\n'
-        r'ENCODING\s+(\d+)\n'
-        r'(?:.*?\n)*?'
-        r'BBX\s+(\d+)\s+(\d+)\s+(-?\d+)\s+(-?\d+)\n'
-        r'(?:.*?\n)*?'
-        r'BITMAP\n([\dA-Fa-f\n]+?)ENDCHAR',
-        re.MULTILINE
-    )
-
-    for match in char_pattern.finditer(content):
-        encoding = int(match.group(1))
-        bbx_width = int(match.group(2))
-        bbx_height = int(match.group(3))
-        bitmap_hex = match.group(6).strip().split('\n')
-
-        if encoding < 32 or encoding > 126:
-            continue
-
-        # Parse bitmap rows - BDF stores MSB as leftmost pixel
-        # For fonts wider than 8px, we need to extract the leftmost 8 bits
-        bitmap = []
-        for hex_row in bitmap_hex:
-            hex_row = hex_row.strip()
-            if hex_row:
-                row_val = int(hex_row, 16)
-                # Calculate total bits in the hex value
-                total_bits = len(hex_row) * 4
-                # Shift right to get the leftmost 8 bits
-                if total_bits > 8:
-                    row_val = (row_val >> (total_bits - 8)) & 0xFF
-                else:
-                    row_val = row_val & 0xFF
-                bitmap.append(row_val)
-
-        glyphs[encoding] = bitmap
-
-    return {
-        'width': font_width,
-        'height': font_height,
-        'glyphs': glyphs
-    }
-
-
-def extract_font_bitmaps(font_path):
-    """Extract all ASCII glyph bitmaps from a font file."""
-    try:
-        font = TTFont(font_path)
-    except Exception as e:
-        return None
-
-    cmap = font.getBestCmap()
-    if not cmap:
-        font.close()
-        return None
-
-    if 'EBDT' not in font or 'EBLC' not in font:
-        font.close()
-        return None
-
-    ebdt = font['EBDT']
-    eblc = font['EBLC']
-
-    # Find the bitmap subtable with metrics
-    strike = eblc.strikes[0]
-    metrics = None
-    for subtable in strike.indexSubTables:
-        if hasattr(subtable, 'metrics'):
-            metrics = subtable.metrics
-            break
-
-    if not metrics:
-        bst = strike.bitmapSizeTable
-        width = bst.hori.widthMax if hasattr(bst, 'hori') else 8
-        height = bst.ppemY
-    else:
-        width = metrics.width
-        height = metrics.height
-
-    glyphs = {}
-
-    for char_code in range(32, 127):
-        if char_code not in cmap:
-            continue
-
-        glyph_name = cmap[char_code]
-        glyph_data = ebdt.strikeData[0].get(glyph_name)
-
-        if not glyph_data or not hasattr(glyph_data, 'data'):
-            continue
-
-        data = glyph_data.data
-
-        bits = []
-        for byte in data:
-            for i in range(7, -1, -1):
-                bits.append((byte >> i) & 1)
-
-        bitmap = []
-        for row in range(height):
-            start = row * width
-            row_bits = bits[start:start + width] if start + width <= len(bits) else [0] * width
-            # Convert to byte (MSB = leftmost)
-            byte_val = 0
-            for col, bit in enumerate(row_bits[:8]):
-                if bit:
-                    byte_val |= (0x80 >> col)
-            bitmap.append(byte_val)
-
-        glyphs[char_code] = bitmap
 
-    font.close()
-
-    return {
-        'width': width,
-        'height': height,
-        'glyphs': glyphs
-    }
-
-
-def generate_html(fonts_dir, output_file):
-    """Generate HTML font browser with canvas-based pixel rendering."""
-    fonts_dir = Path(fonts_dir)
-
-    print("Scanning fonts and extracting bitmaps...")
-    fonts = []
-
-    # Collect both OTB and BDF files
-    otb_files = list(fonts_dir.rglob("*.otb"))
-    bdf_files = list(fonts_dir.rglob("*.bdf"))
-    all_files = [(f, 'otb') for f in otb_files] + [(f, 'bdf') for f in bdf_files]
-    total = len(all_files)
-
-    if total == 0:
-        print("No font files found!")
-        return
-
-    print(f"Found {len(otb_files)} OTB files and {len(bdf_files)} BDF files")
-
-    for i, (font_file, font_type) in enumerate(all_files):
-        if (i + 1) % 50 == 0:
-            print(f"  Processing {i+1}/{total}...")
-
-        if font_type == 'bdf':
-            font_data = extract_bdf_bitmaps(font_file)
-        else:
-            font_data = extract_font_bitmaps(font_file)
-
-        if not font_data or not font_data['glyphs']:
-            continue
-
-        name = font_file.stem
-        size = f"{font_data['width']}x{font_data['height']}"
-
-        fonts.append({
-            'name': name,
-            'size': size,
-            'width': font_data['width'],
-            'height': font_data['height'],
-            'glyphs': {str(k): v for k, v in font_data['glyphs'].items()}
-        })
-
-    # Sort by height first, then width, then name
-    fonts.sort(key=lambda f: (f['height'], f['width'], f['name'].lower()))
-
-    # Get unique sizes
-    def size_sort_key(s):
-        parts = s.split('x')
-        try:
-            return (int(parts[1]), int(parts[0]))
-        except:
-            return (999, 999)
-
-    sizes = sorted(set(f['size'] for f in fonts), key=size_sort_key)
-
-    by_size = defaultdict(list)
-    for f in fonts:
-        by_size[f['size']].append(f)
-
-    # Generate HTML with embedded font data
-    html = '''<!DOCTYPE html>
+# Page head and styles
+HTML_HEAD = '''<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -334,95 +139,124 @@ def generate_html(fonts_dir, output_file):
 <body>
 '''
 
-    html += f'<h1>Pixel Font Browser <span class="stats">({len(fonts)} bitmap fonts)</span></h1>\n'
-
-    # Controls
-    html += '<div class="controls">\n'
-    html += '    <div class="size-filters">\n'
-    html += f'        <button class="size-btn active" data-size="all">All <span class="count">({len(fonts)})</span></button>\n'
-    for size in sizes:
-        count = len(by_size[size])
-        html += f'        <button class="size-btn" data-size="{size}">{size} <span class="count">({count})</span></button>\n'
-    html += '    </div>\n'
-    html += '    <div class="search-box">\n'
-    html += '        <input type="text" id="search" placeholder="Search font names...">\n'
-    html += '        <input type="text" class="sample-input" id="sample-text" value="SCRABBLE 123" placeholder="Sample text">\n'
-    html += '        <div class="scale-controls">\n'
-    html += '            <span class="stats">Scale:</span>\n'
-    html += '            <button class="scale-btn" data-scale="1">1x</button>\n'
-    html += '            <button class="scale-btn" data-scale="2">2x</button>\n'
-    html += '            <button class="scale-btn active" data-scale="3">3x</button>\n'
-    html += '            <button class="scale-btn" data-scale="4">4x</button>\n'
-    html += '        </div>\n'
-    html += '        <span class="stats" id="visible-count"></span>\n'
-    html += '    </div>\n'
-    html += '</div>\n'
-
-    # Font grid
-    html += '<div class="font-grid" id="font-grid">\n'
-    for i, font in enumerate(fonts):
-        html += f'''    <div class="font-card" data-size="{font['size']}" data-name="{font['name'].lower()}" data-idx="{i}">
-        <div class="font-name">{font['name']} <span class="font-size-tag">{font['size']}</span></div>
+# One card per font in the grid; names are HTML-escaped by the caller
+CARD_TMPL = '''    <div class="font-card" data-size="{size}" data-name="{lname}" data-idx="{idx}">
+        <div class="font-name">{name} <span class="font-size-tag">{size}</span></div>
         <div class="font-sample"><canvas class="sample-canvas"></canvas></div>
         <div class="alphabet"><canvas class="alphabet-canvas"></canvas></div>
     </div>
 '''
-    html += '</div>\n'
-
-    # Embed font data as JSON
-    html += '<script>\n'
-    html += 'const fontData = '
-    html += json.dumps(fonts, separators=(',', ':'))
-    html += ';\n'
 
-    # JavaScript for rendering and filtering
-    html += '''
+# JavaScript for rendering and filtering
+SCRIPT_TAIL = '''
 let currentScale = 3;
 let sampleText = 'SCRABBLE 123';
 const alphabetText = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ abcdefghijklmnopqrstuvwxyz 0123456789 !@#$%';
 
+// Glyph bitmaps are embedded once each in glyphBank as base64 strings and
+// each font lists a bank index (or null) per printable ASCII code; decode
+// each font once into a flat array of row bytes, charHeight rows per code
+function glyphRows(font) {
+    if (!font.rows) {
+        const charHeight = font.height;
+        const rows = new Uint8Array(95 * charHeight);
+        for (let cell = 0; cell < 95; cell++) {
+            const bankIdx = font.glyphs[cell];
+            if (bankIdx === null) continue;
+
+            const raw = atob(glyphBank[bankIdx]);
+            const offset = cell * charHeight;
+            const count = Math.min(raw.length, charHeight);
+            for (let i = 0; i < count; i++) {
+                rows[offset + i] = raw.charCodeAt(i);
+            }
+        }
+        font.rows = rows;
+    }
+    return font.rows;
+}
+
+// Render each font's glyphs once into an atlas canvas, one cell per
+// printable ASCII code, so text can be drawn by blitting cells
+function glyphAtlas(font) {
+    if (!font.atlas) {
+        const charWidth = font.width;
+        const charHeight = font.height;
+        const rows = glyphRows(font);
+        const atlas = document.createElement('canvas');
+        atlas.width = 95 * charWidth;
+        atlas.height = charHeight;
+
+        const ctx = atlas.getContext('2d');
+        const img = ctx.createImageData(atlas.width, atlas.height);
+        const pixels = new Uint32Array(img.data.buffer);
+        const cols = Math.min(charWidth, 8);
+        for (let cell = 0; cell < 95; cell++) {
+            const x = cell * charWidth;
+            for (let row = 0; row < charHeight; row++) {
+                const rowByte = rows[cell * charHeight + row];
+                const offset = row * atlas.width + x;
+                for (let col = 0; col < cols; col++) {
+                    if (rowByte & (0x80 >> col)) {
+                        pixels[offset + col] = 0xffffffff;
+                    }
+                }
+            }
+        }
+        ctx.putImageData(img, 0, 0);
+        font.atlas = atlas;
+    }
+    return font.atlas;
+}
+
 function drawText(canvas, font, text, scale) {
     const ctx = canvas.getContext('2d');
     const charWidth = font.width;
     const charHeight = font.height;
+    const atlas = glyphAtlas(font);
 
     canvas.width = text.length * charWidth * scale;
     canvas.height = charHeight * scale;
 
     ctx.fillStyle = '#1a1a2e';
     ctx.fillRect(0, 0, canvas.width, canvas.height);
-
-    ctx.fillStyle = '#ffffff';
+    ctx.imageSmoothingEnabled = false;
 
     for (let i = 0; i < text.length; i++) {
+        // Missing glyphs have blank atlas cells; skip anything outside it
         const charCode = text.charCodeAt(i);
-        const glyphData = font.glyphs[charCode];
-        if (!glyphData) continue;
-
-        const x = i * charWidth * scale;
+        if (charCode < 32 || charCode > 126) continue;
 
-        for (let row = 0; row < charHeight; row++) {
-            const rowByte = glyphData[row] || 0;
-            for (let col = 0; col < charWidth; col++) {
-                if (rowByte & (0x80 >> col)) {
-                    ctx.fillRect(x + col * scale, row * scale, scale, scale);
-                }
-            }
-        }
+        ctx.drawImage(atlas, (charCode - 32) * charWidth, 0, charWidth, charHeight,
+                      i * charWidth * scale, 0, charWidth * scale, charHeight * scale);
     }
 }
 
-function renderAllFonts() {
-    const cards = document.querySelectorAll('.font-card');
-    cards.forEach(card => {
-        const idx = parseInt(card.dataset.idx);
-        const font = fontData[idx];
-        const sampleCanvas = card.querySelector('.sample-canvas');
-        const alphabetCanvas = card.querySelector('.alphabet-canvas');
+function renderCard(card) {
+    const idx = parseInt(card.dataset.idx);
+    const font = fontData[idx];
+    const sampleCanvas = card.querySelector('.sample-canvas');
+    const alphabetCanvas = card.querySelector('.alphabet-canvas');
+
+    drawText(sampleCanvas, font, sampleText, currentScale);
+    drawText(alphabetCanvas, font, alphabetText, Math.max(1, currentScale - 1));
+}
 
-        drawText(sampleCanvas, font, sampleText, currentScale);
-        drawText(alphabetCanvas, font, alphabetText, Math.max(1, currentScale - 1));
+// Cards are drawn only once they scroll near the viewport
+const cardObserver = new IntersectionObserver(entries => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            renderCard(entry.target);
+            cardObserver.unobserve(entry.target);
+        }
     });
+}, { rootMargin: '200px' });
+
+function renderAllFonts() {
+    // (Re)queue every card; the observer draws the visible ones right away
+    // and the rest as they come into view
+    const cards = document.querySelectorAll('.font-card');
+    cards.forEach(card => cardObserver.observe(card));
 }
 
 function updateVisibility() {
@@ -477,8 +311,257 @@ updateVisibility();
 </html>
 '''
 
+
+def decode_bitmap_rows(hex_rows):
+    """Decode BDF hex rows to the leftmost 8 pixels of each row.
+
+    Only the first byte of a row survives MSB alignment, so each row is
+    truncated to two hex digits and the whole glyph is decoded with one
+    bytes.fromhex call instead of a big-int parse and shift per row.
+    The rows come from iter_bdf_glyphs, which has already checked they are hex.
+    """
+    return list(bytes.fromhex(''.join(row[:2].zfill(2) for row in hex_rows)))
+
+
+def extract_bdf_bitmaps(font_path):
+    """Extract glyph bitmaps from a BDF font file."""
+    with open(font_path, 'r') as f:
+        content = f.read()
+
+    # Font bounding box for default dimensions
+    font_width, font_height = bdf_font_size(content)
+
+    # Indexed by char code - 32; None where the font has no glyph
+    glyphs = [None] * 95
+
+    # BDF records are parsed by font_extract, so both tools accept the same
+    # glyphs; rows are MSB-first, leftmost pixel in the top bit
+    for encoding, _bbx, hex_rows in iter_bdf_glyphs(content):
+        glyphs[encoding - 32] = decode_bitmap_rows(hex_rows)
+
+    return {
+        'width': font_width,
+        'height': font_height,
+        'glyphs': glyphs
+    }
+
+
+def extract_font_bitmaps(font_path):
+    """Extract all ASCII glyph bitmaps from a font file."""
+    try:
+        font = TTFont(font_path)
+    except Exception as e:
+        return None
+
+    cmap = font.getBestCmap()
+    if not cmap:
+        font.close()
+        return None
+
+    if 'EBDT' not in font or 'EBLC' not in font:
+        font.close()
+        return None
+
+    ebdt = font['EBDT']
+    eblc = font['EBLC']
+
+    # Find the bitmap subtable with metrics
+    strike = eblc.strikes[0]
+    metrics = None
+    for subtable in strike.indexSubTables:
+        if hasattr(subtable, 'metrics'):
+            metrics = subtable.metrics
+            break
+
+    if not metrics:
+        bst = strike.bitmapSizeTable
+        width = bst.hori.widthMax if hasattr(bst, 'hori') else 8
+        height = bst.ppemY
+    else:
+        width = metrics.width
+        height = metrics.height
+
+    # Indexed by char code - 32; None where the font has no glyph
+    glyphs = [None] * 95
+
+    # Every glyph in the strike shares these, so set them up once
+    strike_data = ebdt.strikeData[0]
+    keep = min(width, 8)
+    mask = (1 << keep) - 1
+
+    for char_code in range(32, 127):
+        if char_code not in cmap:
+            continue
+
+        glyph_name = cmap[char_code]
+        glyph_data = strike_data.get(glyph_name)
+
+        if not glyph_data or not hasattr(glyph_data, 'data'):
+            continue
+
+        data = glyph_data.data
+
+        if width == 8:
+            # Exactly one byte per row: the data already is the bitmap
+            bitmap = list(data[:height])
+            bitmap.extend([0] * (height - len(bitmap)))
+        else:
+            # Rows are bit-packed MSB first; treat the glyph as one big integer
+            # and shift each row's leftmost 8 pixels out of it
+            total_bits = len(data) * 8
+            packed = int.from_bytes(data, 'big')
+
+            bitmap = []
+            for row in range(height):
+                start = row * width
+                if start + width <= total_bits:
+                    # Convert to byte (MSB = leftmost)
+                    byte_val = (packed >> (total_bits - start - keep)) & mask
+                    bitmap.append(byte_val << (8 - keep))
+                else:
+                    bitmap.append(0)
+
+        glyphs[char_code - 32] = bitmap
+
+    font.close()
+
+    return {
+        'width': width,
+        'height': height,
+        'glyphs': glyphs
+    }
+
+
+def extract_file_bitmaps(entry):
+    """Extract bitmaps for one (path, type) entry; runs in a worker process."""
+    font_file, font_type = entry
+    if font_type == 'bdf':
+        return extract_bdf_bitmaps(font_file)
+    return extract_font_bitmaps(font_file)
+
+
+def generate_html(fonts_dir, output_file):
+    """Generate HTML font browser with canvas-based pixel rendering."""
+    fonts_dir = Path(fonts_dir)
+
+    print("Scanning fonts and extracting bitmaps...")
+    fonts = []
+
+    # Identical glyphs (space, punctuation, ...) recur across many fonts, so
+    # each distinct bitmap is stored once in a shared bank and fonts refer
+    # to it by index
+    glyph_bank = []
+    bank_index = {}
+
+    # Collect both OTB and BDF files
+    otb_files = list(fonts_dir.rglob("*.otb"))
+    bdf_files = list(fonts_dir.rglob("*.bdf"))
+    all_files = [(f, 'otb') for f in otb_files] + [(f, 'bdf') for f in bdf_files]
+    total = len(all_files)
+
+    if total == 0:
+        print("No font files found!")
+        return
+
+    print(f"Found {len(otb_files)} OTB files and {len(bdf_files)} BDF files")
+
+    # Fonts are independent, so extract them across all cores
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(extract_file_bitmaps, all_files, chunksize=8)
+        for i, ((font_file, font_type), font_data) in enumerate(zip(all_files, results)):
+            if (i + 1) % 50 == 0:
+                print(f"  Processing {i+1}/{total}...")
+
+            if not font_data or font_data['glyphs'].count(None) == 95:
+                continue
+
+            name = font_file.stem
+            size = f"{font_data['width']}x{font_data['height']}"
+
+            glyphs = []
+            for bitmap in font_data['glyphs']:
+                if bitmap is None:
+                    glyphs.append(None)
+                    continue
+                key = bytes(bitmap)
+                idx = bank_index.get(key)
+                if idx is None:
+                    idx = bank_index[key] = len(glyph_bank)
+                    # One byte per row, base64-encoded to keep the embedded JSON small
+                    glyph_bank.append(base64.b64encode(key).decode('ascii'))
+                glyphs.append(idx)
+
+            fonts.append({
+                'name': name,
+                'size': size,
+                'width': font_data['width'],
+                'height': font_data['height'],
+                'glyphs': glyphs
+            })
+
+    # Sort by height first, then width, then name
+    fonts.sort(key=lambda f: (f['height'], f['width'], f['name'].lower()))
+
+    # Group by size; fonts are already in (height, width) order, so the
+    # sizes come out sorted without parsing the size strings
+    by_size = defaultdict(list)
+    for f in fonts:
+        by_size[f['size']].append(f)
+    sizes = list(by_size)
+
+    # Generate HTML with embedded font data
+    parts = [HTML_HEAD]
+
+    parts.append(f'<h1>Pixel Font Browser <span class="stats">({len(fonts)} bitmap fonts)</span></h1>\n')
+
+    # Controls
+    parts.append('<div class="controls">\n')
+    parts.append('    <div class="size-filters">\n')
+    parts.append(f'        <button class="size-btn active" data-size="all">All <span class="count">({len(fonts)})</span></button>\n')
+    for size in sizes:
+        count = len(by_size[size])
+        parts.append(f'        <button class="size-btn" data-size="{size}">{size} <span class="count">({count})</span></button>\n')
+    parts.append('    </div>\n')
+    parts.append('    <div class="search-box">\n')
+    parts.append('        <input type="text" id="search" placeholder="Search font names...">\n')
+    parts.append('        <input type="text" class="sample-input" id="sample-text" value="SCRABBLE 123" placeholder="Sample text">\n')
+    parts.append('        <div class="scale-controls">\n')
+    parts.append('            <span class="stats">Scale:</span>\n')
+    parts.append('            <button class="scale-btn" data-scale="1">1x</button>\n')
+    parts.append('            <button class="scale-btn" data-scale="2">2x</button>\n')
+    parts.append('            <button class="scale-btn active" data-scale="3">3x</button>\n')
+    parts.append('            <button class="scale-btn" data-scale="4">4x</button>\n')
+    parts.append('        </div>\n')
+    parts.append('        <span class="stats" id="visible-count"></span>\n')
+    parts.append('    </div>\n')
+    parts.append('</div>\n')
+
+    # Font grid
+    parts.append('<div class="font-grid" id="font-grid">\n')
+    for i, font in enumerate(fonts):
+        name = font['name']
+        parts.append(CARD_TMPL.format(size=font['size'], lname=html.escape(name.lower()),
+                                      idx=i, name=html.escape(name)))
+    parts.append('</div>\n')
+
+    # Embed font data as JSON
+    parts.append('<script>\n')
+    parts.append('const fontData = ')
+
+    # Stream the font data one font at a time rather than serializing the
+    # whole list into one string, then append the rendering/filtering JS
     with open(output_file, 'w') as f:
-        f.write(html)
+        f.writelines(parts)
+        f.write('[')
+        for i, font in enumerate(fonts):
+            if i:
+                f.write(',')
+            f.write(json.dumps(font, separators=(',', ':'), check_circular=False))
+        f.write('];\n')
+        f.write('const glyphBank = ')
+        f.write(json.dumps(glyph_bank, separators=(',', ':')))
+        f.write(';\n')
+        f.write(SCRIPT_TAIL)
 
     print(f"\nGenerated {output_file} with {len(fonts)} fonts")
     print(f"Sizes found: {', '.join(sizes)}")
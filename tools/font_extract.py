@@ -17,54 +17,81 @@ if venv_path.exists():
     for p in venv_path.glob('python*/site-packages'):
         site.addsitedir(str(p))
 
+# BDF records, matched within a single STARTCHAR..ENDCHAR region
+_ENC_RE = re.compile(r'^ENCODING\s+(\d+)', re.MULTILINE)
+_BBX_RE = re.compile(r'^BBX\s+(\d+)\s+(\d+)\s+(-?\d+)\s+(-?\d+)', re.MULTILINE)
+_BITMAP_RE = re.compile(r'^BITMAP\s*?$(.*?)^ENDCHAR', re.MULTILINE | re.DOTALL)
+_HEX_ROWS_RE = re.compile(r'[0-9A-Fa-f\s]*')
+
+# C literal for every row byte
+_HEX_BYTE = [f"0x{b:02X}" for b in range(256)]
+
+# Comment label for each character cell in the C output
+_CHAR_REPRS = tuple(repr(chr(c)) if 32 <= c < 127 else f"({c})" for c in range(128))
+
+
+def bdf_font_size(content):
+    """Return the (width, height) of a BDF font's FONTBOUNDINGBOX, or 8x8."""
+    bbox_match = re.search(r'FONTBOUNDINGBOX\s+(\d+)\s+(\d+)', content)
+    if bbox_match:
+        return int(bbox_match.group(1)), int(bbox_match.group(2))
+    return 8, 8
+
+
+def iter_bdf_glyphs(content):
+    """Yield (encoding, bbx, hex_rows) for each printable ASCII glyph in BDF text.
+
+    `bbx` is the glyph's (width, height, offset_x, offset_y) and `hex_rows`
+    its BITMAP rows as hex strings, MSB leftmost. Glyphs missing a BBX or
+    BITMAP record, or with a row that is not hex, are skipped; an empty
+    BITMAP yields a glyph with no rows.
+    """
+    # Split the file into STARTCHAR regions and run each anchored record
+    # pattern once per region
+    for region in content.split('\nSTARTCHAR')[1:]:
+        # Check the encoding first so glyphs outside printable ASCII (most
+        # of a Unicode BDF) are dropped before their BBX/BITMAP are touched
+        enc_match = _ENC_RE.search(region)
+        if not enc_match:
+            continue
+        encoding = int(enc_match.group(1))
+        if encoding < 32 or encoding > 126:
+            continue
+
+        bbx_match = _BBX_RE.search(region)
+        bitmap_match = _BITMAP_RE.search(region)
+        if not bbx_match or not bitmap_match:
+            continue
+        bitmap_text = bitmap_match.group(1)
+        if not _HEX_ROWS_RE.fullmatch(bitmap_text):
+            continue
+
+        yield encoding, tuple(map(int, bbx_match.groups())), bitmap_text.split()
+
 
 def extract_bdf_bitmaps(font_path):
     """Extract glyph bitmaps from a BDF font file."""
     with open(font_path, 'r') as f:
         content = f.read()
 
-    # Get font bounding box for default dimensions
-    bbox_match = re.search(r'FONTBOUNDINGBOX\s+(\d+)\s+(\d+)', content)
-    if bbox_match:
-        font_width = int(bbox_match.group(1))
-        font_height = int(bbox_match.group(2))
-    else:
-        font_width = 8
-        font_height = 8
+    # Font bounding box for default dimensions
+    font_width, font_height = bdf_font_size(content)
 
     glyphs = {}
 
-    # Parse each character
-    char_pattern = re.compile(
-        r'STARTCHAR\s+\S+\n'
-        r'ENCODING\s+(\d+)\n'
-        r'(?:.*?\n)*?'
-        r'BBX\s+(\d+)\s+(\d+)\s+(-?\d+)\s+(-?\d+)\n'
-        r'(?:.*?\n)*?'
-        r'BITMAP\n([\dA-Fa-f\n]+?)ENDCHAR',
-        re.MULTILINE
-    )
-
-    for match in char_pattern.finditer(content):
-        encoding = int(match.group(1))
-        bbx_width = int(match.group(2))
-        bbx_height = int(match.group(3))
-        bbx_offset_x = int(match.group(4))
-        bbx_offset_y = int(match.group(5))
-        bitmap_hex = match.group(6).strip().split('\n')
+    # Max dimensions used, tracked while parsing
+    max_width = max_height = -1
 
-        if encoding < 32 or encoding > 126:
-            continue
+    for encoding, bbx, hex_rows in iter_bdf_glyphs(content):
+        bbx_width, bbx_height, bbx_offset_x, bbx_offset_y = bbx
+        if bbx_width > max_width:
+            max_width = bbx_width
+        if bbx_height > max_height:
+            max_height = bbx_height
 
         # Parse bitmap rows (hex values)
-        bitmap = []
-        for hex_row in bitmap_hex:
-            hex_row = hex_row.strip()
-            if hex_row:
-                row_val = int(hex_row, 16)
-                # Shift to align with MSB based on width
-                # BDF stores with MSB at leftmost pixel
-                bitmap.append(row_val)
+        # BDF stores with MSB at leftmost pixel
+        bitmap = [int(hex_row, 16) for hex_row in hex_rows]
 
         glyphs[encoding] = {
             'width': bbx_width,
@@ -74,9 +101,9 @@ def extract_bdf_bitmaps(font_path):
             'bitmap': bitmap
         }
 
-    # Find the max dimensions used
-    max_width = max((g['width'] for g in glyphs.values()), default=font_width)
-    max_height = max((g['height'] for g in glyphs.values()), default=font_height)
+    if not glyphs:
+        max_width = font_width
+        max_height = font_height
 
     return {
         'width': max_width,
@@ -125,32 +152,41 @@ def extract_otb_bitmaps(font_path):
 
     glyphs = {}
 
+    # Every glyph in the strike shares these, so set them up once
+    strike_data = ebdt.strikeData[0]
+    keep = min(width, 8)
+    mask = (1 << keep) - 1
+
     for char_code in range(32, 127):
         if char_code not in cmap:
             continue
 
         glyph_name = cmap[char_code]
-        glyph_data = ebdt.strikeData[0].get(glyph_name)
+        glyph_data = strike_data.get(glyph_name)
 
         if not glyph_data or not hasattr(glyph_data, 'data'):
             continue
 
         data = glyph_data.data
 
-        bits = []
-        for byte in data:
-            for i in range(7, -1, -1):
-                bits.append((byte >> i) & 1)
-
-        bitmap = []
-        for row in range(height):
-            start = row * width
-            row_bits = bits[start:start + width] if start + width <= len(bits) else [0] * width
-            byte_val = 0
-            for col, bit in enumerate(row_bits[:8]):
-                if bit:
-                    byte_val |= (0x80 >> col)
-            bitmap.append(byte_val)
+        if width == 8:
+            # Exactly one byte per row: the data already is the bitmap
+            bitmap = list(data[:height])
+            bitmap.extend([0] * (height - len(bitmap)))
+        else:
+            # Rows are bit-packed MSB first; treat the glyph as one big integer
+            # and shift each row's leftmost 8 pixels out of it
+            total_bits = len(data) * 8
+            packed = int.from_bytes(data, 'big')
+
+            bitmap = []
+            for row in range(height):
+                start = row * width
+                if start + width <= total_bits:
+                    byte_val = (packed >> (total_bits - start - keep)) & mask
+                    bitmap.append(byte_val << (8 - keep))
+                else:
+                    bitmap.append(0)
 
         glyphs[char_code] = {
             'width': width,
@@ -176,6 +212,14 @@ def extract_font_bitmaps(font_path):
         return extract_otb_bitmaps(font_path)
 
 
+def aligned_rows(glyph):
+    """Return a glyph's rows as bytes holding its leftmost 8 pixels."""
+    # BDF stores with MSB as leftmost pixel, already correctly aligned;
+    # for wider glyphs (>8 pixels), take the leftmost 8 bits
+    shift = max(glyph['width'] - 8, 0)
+    return [(row_val >> shift) & 0xFF for row_val in glyph['bitmap']]
+
+
 def generate_c_code(font_data, font_name, output_path, target_height=8):
     """Generate C code for Sega Genesis from extracted font data."""
     width = font_data['width']
@@ -197,29 +241,19 @@ def generate_c_code(font_data, font_name, output_path, target_height=8):
     ]
 
     for char_code in range(32, 128):
-        char_repr = repr(chr(char_code)) if 32 <= char_code < 127 else f"({char_code})"
+        char_repr = _CHAR_REPRS[char_code]
         if char_code in glyphs:
             glyph = glyphs[char_code]
-            bitmap = glyph['bitmap']
+            bitmap = aligned_rows(glyph)
             glyph_height = glyph.get('height', len(bitmap))
 
-            row_bytes = []
             # Center vertically in target height
             top_pad = (out_height - glyph_height) // 2
-            for row in range(out_height):
-                src_row = row - top_pad
-                if 0 <= src_row < len(bitmap):
-                    byte_val = bitmap[src_row]
-                    # BDF stores with MSB as leftmost pixel, already correctly aligned
-                    # For wider glyphs (>8 pixels), take the leftmost 8 bits
-                    if glyph['width'] > 8:
-                        byte_val = (byte_val >> (glyph['width'] - 8)) & 0xFF
-                    else:
-                        byte_val = byte_val & 0xFF
-                    row_bytes.append(f"0x{byte_val:02X}")
-                else:
-                    row_bytes.append("0x00")
-            lines.append(f"    /* {char_repr} */ {{{', '.join(row_bytes)}}},")
+            rows = [0] * out_height
+            for row in range(max(top_pad, 0), min(out_height, top_pad + len(bitmap))):
+                rows[row] = bitmap[row - top_pad]
+            row_bytes = ', '.join([_HEX_BYTE[b] for b in rows])
+            lines.append(f"    /* {char_repr} */ {{{row_bytes}}},")
         else:
             empty = ', '.join(['0x00'] * out_height)
             lines.append(f"    /* {char_repr} */ {{{empty}}},")
@@ -242,16 +276,7 @@ def generate_json(font_data, font_name, output_path):
     }
 
     for char_code, glyph in font_data['glyphs'].items():
-        bitmap = glyph['bitmap']
-        # BDF stores with MSB as leftmost pixel, already correctly aligned
-        hex_rows = []
-        for row_val in bitmap:
-            if glyph['width'] > 8:
-                row_val = (row_val >> (glyph['width'] - 8)) & 0xFF
-            else:
-                row_val = row_val & 0xFF
-            hex_rows.append(row_val)
-        output['glyphs'][str(char_code)] = hex_rows
+        output['glyphs'][str(char_code)] = aligned_rows(glyph)
 
     with open(output_path, 'w') as f:
         json.dump(output, f)
@@ -18,56 +18,62 @@ KLV16 format (Genesis):
 import struct
 import sys
 import os
+from array import array
+
+from binary_input import map_input
 
 def convert_klv2_to_klv16(input_path, output_path):
     """Convert a .klv2 file to .klv16 format."""
 
-    with open(input_path, 'rb') as f:
-        data = f.read()
-
-    offset = 0
-
-    # Read KWG size
-    kwg_size = struct.unpack_from('<I', data, offset)[0]
-    offset += 4
-    print(f"KWG size: {kwg_size} nodes")
-
-    # Read KWG nodes
-    kwg_nodes = struct.unpack_from(f'<{kwg_size}I', data, offset)
-    offset += kwg_size * 4
-    print(f"KWG data: {kwg_size * 4} bytes")
-
-    # Read number of leaves
-    num_leaves = struct.unpack_from('<I', data, offset)[0]
-    offset += 4
-    print(f"Number of leaves: {num_leaves}")
-
-    # Read leave values as floats
-    leave_values_float = struct.unpack_from(f'<{num_leaves}f', data, offset)
-    offset += num_leaves * 4
+    # Map the input rather than reading a copy of it; only the parts that
+    # are kept are copied out
+    with open(input_path, 'rb') as f, map_input(f) as data:
+        offset = 0
+
+        # Read KWG size
+        kwg_size = struct.unpack_from('<I', data, offset)[0]
+        offset += 4
+        print(f"KWG size: {kwg_size} nodes")
+
+        # Read KWG nodes (kept as raw little-endian bytes, written back unchanged)
+        kwg_nodes = data[offset:offset + kwg_size * 4]
+        offset += kwg_size * 4
+        print(f"KWG data: {kwg_size * 4} bytes")
+
+        # Read number of leaves
+        num_leaves = struct.unpack_from('<I', data, offset)[0]
+        offset += 4
+        print(f"Number of leaves: {num_leaves}")
+
+        # Read leave values as floats, copied in bulk from the file buffer
+        leave_values_float = array('f')
+        with memoryview(data) as view:
+            leave_values_float.frombytes(view[offset:offset + num_leaves * 4])
+        if sys.byteorder != 'little':
+            leave_values_float.byteswap()
+        offset += num_leaves * 4
+
+    min_val = min(leave_values_float, default=float('inf'))
+    max_val = max(leave_values_float, default=float('-inf'))
 
     # Convert to eighths of a point (int16)
-    leave_values_int16 = []
-    clipped_count = 0
-    min_val = float('inf')
-    max_val = float('-inf')
-
-    for val in leave_values_float:
-        min_val = min(min_val, val)
-        max_val = max(max_val, val)
-
-        # Convert to eighths of a point
-        val_eighths = round(val * 8)
+    leave_values_int16 = [round(val * 8) for val in leave_values_float]
 
-        # Clip to int16 range
-        if val_eighths > 32767:
-            val_eighths = 32767
-            clipped_count += 1
-        elif val_eighths < -32768:
-            val_eighths = -32768
-            clipped_count += 1
-
-        leave_values_int16.append(val_eighths)
+    # Clip to int16 range; rounding is monotonic, so the extremes tell
+    # whether any value needs clipping without checking each one
+    clipped_count = 0
+    if num_leaves and (round(min_val * 8) < -32768 or round(max_val * 8) > 32767):
+        # Clamp and count in one pass
+        clipped = []
+        for val in leave_values_int16:
+            if val > 32767:
+                val = 32767
+                clipped_count += 1
+            elif val < -32768:
+                val = -32768
+                clipped_count += 1
+            clipped.append(val)
+        leave_values_int16 = clipped
 
     print(f"Leave value range: {min_val:.3f} to {max_val:.3f} points")
     print(f"In eighths: {round(min_val * 8)} to {round(max_val * 8)}")
@@ -80,13 +86,16 @@ def convert_klv2_to_klv16(input_path, output_path):
         f.write(struct.pack('<I', kwg_size))
 
         # KWG nodes
-        f.write(struct.pack(f'<{kwg_size}I', *kwg_nodes))
+        f.write(kwg_nodes)
 
         # Number of leaves
         f.write(struct.pack('<I', num_leaves))
 
         # Leave values as int16
-        f.write(struct.pack(f'<{num_leaves}h', *leave_values_int16))
+        leaves = array('h', leave_values_int16)
+        if sys.byteorder != 'little':
+            leaves.byteswap()
+        leaves.tofile(f)
 
     input_size = os.path.getsize(input_path)
     output_size = os.path.getsize(output_path)
@@ -14,33 +14,35 @@ We output the raw bytes as a uint8_t array for the klv_init function.
 import sys
 import os
 
+from binary_input import map_input
+
 def convert_klv16(input_file, output_file):
     """Convert KLV16 binary to C source file."""
 
-    with open(input_file, 'rb') as f:
-        data = f.read()
-
-    print(f"Converting {input_file}: {len(data)} bytes")
-
-    with open(output_file, 'w') as f:
-        f.write("/* Auto-generated KLV16 leave values data */\n")
-        f.write("/* Source: %s */\n" % os.path.basename(input_file))
-        f.write("/* Size: %d bytes */\n\n" % len(data))
-        f.write("#include <stdint.h>\n\n")
-        f.write("const uint8_t klv_data[] = {\n")
-
-        # Output bytes, 16 per line
-        for i in range(0, len(data), 16):
-            f.write("    ")
-            chunk = data[i:i+16]
-            hex_bytes = ", ".join("0x%02X" % b for b in chunk)
-            f.write(hex_bytes)
-            if i + 16 < len(data):
-                f.write(",")
-            f.write("\n")
-
-        f.write("};\n\n")
-        f.write("const unsigned int klv_data_size = %d;\n" % len(data))
+    # Map the input rather than reading a copy of it
+    with open(input_file, 'rb') as src, map_input(src) as data:
+        print(f"Converting {input_file}: {len(data)} bytes")
+
+        with open(output_file, 'w', buffering=1 << 20) as f:
+            f.write("/* Auto-generated KLV16 leave values data */\n")
+            f.write("/* Source: %s */\n" % os.path.basename(input_file))
+            f.write("/* Size: %d bytes */\n\n" % len(data))
+            f.write("#include <stdint.h>\n\n")
+            f.write("const uint8_t klv_data[] = {\n")
+
+            # Output bytes, 16 per line; each row after the first is preceded
+            # by the previous row's trailing comma
+            sep = "    "
+            for i in range(0, len(data), 16):
+                f.write(sep)
+                # bytes.hex formats the whole row in C: "AB,CD,..." -> "0xAB, 0xCD, ..."
+                f.write("0x" + data[i:i+16].hex(",").upper().replace(",", ", 0x"))
+                sep = ",\n    "
+            if data:
+                f.write("\n")
+
+            f.write("};\n\n")
+            f.write("const unsigned int klv_data_size = %d;\n" % len(data))
 
     print(f"Output written to {output_file}")
 
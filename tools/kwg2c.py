@@ -7,43 +7,48 @@ We convert to big-endian for the 68000 CPU.
 """
 
 import sys
-import struct
 import os
+from array import array
+
+from binary_input import map_input
+
+# One output line of 8 nodes
+WORDS_PER_LINE = 8
+LINE_FORMAT = "    " + "0x%08X, " * (WORDS_PER_LINE - 1) + "0x%08X,\n"
 
 def convert_kwg(input_file, output_file):
     """Convert KWG binary to C source file."""
 
-    with open(input_file, 'rb') as f:
-        data = f.read()
+    # Map the input rather than reading a copy of it; the nodes are copied
+    # straight into the word array
+    with open(input_file, 'rb') as f, map_input(f) as data:
+        size = len(data)
+        num_nodes = size // 4
 
-    num_nodes = len(data) // 4
-    print(f"Converting {input_file}: {num_nodes} nodes ({len(data)} bytes)")
+        # Read as little-endian, we'll let the code handle endianness
+        # The 68000 is big-endian but we store as-is and convert at runtime
+        words = array('I')
+        with memoryview(data) as view:
+            words.frombytes(view[:num_nodes * 4])
+        if sys.byteorder != 'little':
+            words.byteswap()
 
-    with open(output_file, 'w') as f:
+    print(f"Converting {input_file}: {num_nodes} nodes ({size} bytes)")
+
+    with open(output_file, 'w', buffering=1 << 20) as f:
         f.write("/* Auto-generated KWG lexicon data */\n")
         f.write("/* Source: %s */\n" % os.path.basename(input_file))
-        f.write("/* Nodes: %d, Size: %d bytes */\n\n" % (num_nodes, len(data)))
+        f.write("/* Nodes: %d, Size: %d bytes */\n\n" % (num_nodes, size))
         f.write("#include <stdint.h>\n\n")
         f.write("const uint32_t kwg_data[] = {\n")
 
-        # Process 4 bytes at a time
-        for i in range(0, len(data), 4):
-            if i + 4 > len(data):
-                break
-
-            # Read as little-endian, we'll let the code handle endianness
-            # The 68000 is big-endian but we store as-is and convert at runtime
-            value = struct.unpack('<I', data[i:i+4])[0]
-
-            if i % 32 == 0:
-                f.write("    ")
-
-            f.write("0x%08X," % value)
-
-            if (i + 4) % 32 == 0:
-                f.write("\n")
-            else:
-                f.write(" ")
+        # Format a whole line of nodes per call; a short final line keeps
+        # the trailing ", " separator
+        full = len(words) - len(words) % WORDS_PER_LINE
+        for i in range(0, full, WORDS_PER_LINE):
+            f.write(LINE_FORMAT % tuple(words[i:i + WORDS_PER_LINE]))
+        if full < len(words):
+            f.write("    " + "".join(["0x%08X, " % w for w in words[full:]]))
 
         f.write("\n};\n\n")
         f.write("const unsigned int kwg_data_size = %d;\n" % num_nodes)
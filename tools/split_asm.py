@@ -10,54 +10,56 @@ Features:
 
 Usage:
     python3 split_asm.py input.lst output_dir/
+    python3 split_asm.py input.lst output_dir/ --only 'game*.c' --skip '*test*'
+    python3 split_asm.py input.lst output_dir/ --gzip   # also write .gz copies
 """
 
 import os
 import re
 import sys
 import html
+import gzip
 import json
-from collections import defaultdict
-from dataclasses import dataclass, field
+import fnmatch
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
-from typing import Optional
+from typing import IO, Callable, Iterator, Optional
 
 
-@dataclass
-class AsmLine:
-    """A single assembly instruction."""
-    address: int
-    hex_bytes: str
-    instruction: str
-    raw_line: str
-    cycles: int = 0  # CPU cycles spent at this address (from profiler)
-
-
-@dataclass
 class SourceBlock:
-    """A block of source code with associated assembly."""
-    file_path: str
-    line_number: int
-    source_text: str
-    asm_lines: list[AsmLine] = field(default_factory=list)
+    """A block of source code with associated assembly.
 
+    The block's instructions are stored column-wise, one list per field
+    with the i-th entry of each belonging to the i-th instruction, rather
+    than as one object per instruction.
+    """
+    __slots__ = ('file_path', 'line_number', 'source_text',
+                 'addresses', 'hex_bytes', 'instructions', 'cycles')
 
-@dataclass
-class AsmBlock:
-    """A block of assembly with associated source info."""
-    asm_lines: list[AsmLine]
-    source_file: Optional[str] = None
-    source_line: Optional[int] = None
-    source_text: Optional[str] = None
+    def __init__(self, file_path: str, line_number: int, source_text: str):
+        self.file_path = file_path
+        self.line_number = line_number
+        self.source_text = source_text
+        self.addresses: list[str] = []  # hex, as format_address returns them
+        self.hex_bytes: list[str] = []
+        self.instructions: list[str] = []
+        # CPU cycles spent at each address (from profiler); None if no profile
+        self.cycles: Optional[list[int]] = None
 
 
-@dataclass
 class Function:
     """A function with its source blocks and assembly."""
-    name: str
-    address: int
-    source_blocks: list[SourceBlock] = field(default_factory=list)
-    asm_blocks: list[AsmBlock] = field(default_factory=list)
+    __slots__ = ('name', 'address', 'source_blocks')
+
+    def __init__(self, name: str, address: str,
+                 source_blocks: Optional[list[SourceBlock]] = None):
+        self.name = name
+        self.address = address  # hex, as format_address returns it
+        self.source_blocks = [] if source_blocks is None else source_blocks
 
 
 @dataclass
@@ -65,7 +67,7 @@ class ProfileData:
     """Profiling data loaded from JSON."""
     sample_rate: int
     total_cycles: int
-    address_cycles: dict[int, int]  # address -> cycles
+    address_cycles: dict[str, int]  # format_address() hex -> cycles
 
 
 def load_profile(path: str) -> Optional[ProfileData]:
@@ -74,7 +76,7 @@ def load_profile(path: str) -> Optional[ProfileData]:
         with open(path) as f:
             data = json.load(f)
         address_cycles = {
-            int(addr, 16): cycles
+            f'{int(addr, 16):08x}': cycles
             for addr, cycles in data.get('addresses', {}).items()
         }
         return ProfileData(
@@ -87,30 +89,36 @@ def load_profile(path: str) -> Optional[ProfileData]:
         return None
 
 
-def annotate_with_profile(files: dict[str, list[Function]], profile: ProfileData) -> None:
-    """Annotate AsmLines with cycle counts from profile data."""
-    for functions in files.values():
-        for func in functions:
-            for sb in func.source_blocks:
-                for asm in sb.asm_lines:
-                    asm.cycles = profile.address_cycles.get(asm.address, 0)
+def annotate_with_profile(func: Function, profile: ProfileData) -> None:
+    """Annotate a function's instructions with cycle counts from profile data."""
+    get_cycles = profile.address_cycles.get
+    for sb in func.source_blocks:
+        sb.cycles = [get_cycles(address, 0) for address in sb.addresses]
+
 
+PREFIXES_TO_STRIP = (
+    '/proc/self/cwd/',
+    '/private/var/tmp/_bazel',
+    'bazel-out/',
+    'external/',
+)
+PATH_MARKERS = ('/src/', '/inc/', '/build/')
+# Source references to these files switch the current output file
+SOURCE_EXTENSIONS = ('.c', '.s', '.S')
 
+
+# A listing only names a handful of distinct files but refers to them on
+# every source line, so both path helpers are memoized.
+@lru_cache(maxsize=None)
 def normalize_path(path: str) -> str:
     """Normalize paths from objdump output."""
-    prefixes_to_strip = [
-        '/proc/self/cwd/',
-        '/private/var/tmp/_bazel',
-        'bazel-out/',
-        'external/',
-    ]
-    for prefix in prefixes_to_strip:
+    for prefix in PREFIXES_TO_STRIP:
         if prefix in path:
             idx = path.find(prefix)
             path = path[idx + len(prefix):]
             break
     path = path.lstrip('./')
-    for marker in ['/src/', '/inc/', '/build/']:
+    for marker in PATH_MARKERS:
         if marker in path:
             idx = path.find(marker)
             path = path[idx + 1:]
@@ -118,631 +126,985 @@ def normalize_path(path: str) -> str:
     return path
 
 
+@lru_cache(maxsize=None)
 def get_display_name(path: str) -> str:
     """Get a short display name for the sidebar."""
     return os.path.basename(normalize_path(path))
 
 
-def parse_objdump(input_file: str) -> dict[str, list[Function]]:
+# One pattern classifies every line of the listing. It runs with finditer
+# over large blocks of text so the per-line dispatch happens inside the
+# regex engine; the alternatives are tried in order, so earlier kinds win
+# exactly as a chain of separate matches would, and `lastgroup` names the
+# kind that matched. [^\S\n] stands in for \s so no match spans lines.
+OBJDUMP_LINE_PATTERN = re.compile(r'''
+    ^(?:
+        # DWARF discriminator annotation on a line of its own
+        (?P<discriminator>[^\S\n]*\(discriminator[^\S\n]+\d+\)[^\S\n]*)
+        # Section header
+      | (?P<section>Disassembly\ of\ section\ [^:\n]+:.*)
+        # Function header: "00000000 <name>:"
+      | (?P<func_addr>[0-9a-fA-F]+)[^\S\n]+<(?P<func_name>[^>\n]+)>:.*
+        # Source file:line reference, optionally with inline text
+      | (?P<path>/[^\s:]+|[a-zA-Z0-9_./-]+\.[chsS]):(?P<line_num>\d+)(?P<rest>[^\S\n].*)?
+        # Assembly instruction: "   1c:\t4e56 0000 \tlinkw %fp,#0"
+      | [^\S\n]*(?P<asm_addr>[0-9a-fA-F]+):[^\S\n]+(?P<hex>[0-9a-fA-F\ ]+?)[^\S\n]+(?P<instr>.+)
+        # Anything else: source text, or a blank line
+      | (?P<text>.*)
+    )$
+''', re.MULTILINE | re.VERBOSE)
+# Strip discriminator annotations from inline source text
+DISCRIMINATOR_SUFFIX_PATTERN = re.compile(r'\s*\(discriminator\s+\d+\)')
+
+# Text is read in blocks of about this many characters, cut at a newline
+READ_BLOCK_SIZE = 1 << 16
+
+
+def read_line_blocks(f: IO[str]) -> Iterator[str]:
+    """Yield the text of `f` in large blocks that each end at a line break."""
+    carry = ''
+    while True:
+        block = f.read(READ_BLOCK_SIZE)
+        if not block:
+            break
+        cut = block.rfind('\n') + 1
+        if cut:
+            yield carry + block[:cut]
+            carry = block[cut:]
+        else:
+            carry += block
+    if carry:
+        yield carry
+
+
+def format_address(hex_digits: str) -> str:
+    """Pad an address as printed by objdump to at least 8 hex digits.
+
+    Same result as f'{int(hex_digits, 16):08x}' for objdump's lowercase
+    output, without the round trip through int.
     """
-    Parse objdump -d -S output into structured data.
+    return hex_digits.lstrip('0').rjust(8, '0')
 
-    Returns dict mapping normalized file paths to list of functions.
+
+def parse_objdump(input_file: str,
+                  keep_file: Optional[Callable[[str], bool]] = None) -> Iterator[tuple[str, Function]]:
     """
-    files: dict[str, list[Function]] = defaultdict(list)
+    Parse objdump -d -S output into structured data.
 
+    Yields (normalized file path, function) pairs as each function is
+    completed, so callers can write output without holding the whole
+    listing in memory. A function whose code spans several files is
+    yielded once per file.
+
+    If `keep_file` is given, code attributed to files it rejects is not
+    built into blocks at all and nothing is yielded for those files.
+    """
     current_func: Optional[Function] = None
     current_file = "_unknown_"
+    # True while current_file is one keep_file rejected
+    skipping = keep_file is not None and not keep_file(current_file)
     current_source_block: Optional[SourceBlock] = None
-    pending_source_lines: list[tuple[str, int, str]] = []  # (file, line, text)
-
-    # Regex patterns
-    func_pattern = re.compile(r'^([0-9a-fA-F]+)\s+<([^>]+)>:')
-    file_line_pattern = re.compile(r'^(/[^\s:]+|[a-zA-Z0-9_./-]+\.[chsS]):(\d+)(\s.*)?$')
-    asm_pattern = re.compile(r'^\s*([0-9a-fA-F]+):\s+([0-9a-fA-F ]+?)\s+(.+)$')
-    section_pattern = re.compile(r'^Disassembly of section ([^:]+):')
-    # Filter out discriminator annotations (DWARF debug info for loop iterations)
-    discriminator_pattern = re.compile(r'^\s*\(discriminator\s+\d+\)\s*$')
+    # Most recent file:line reference not yet attached to asm, as
+    # [file, line, text fragments]; only the latest reference is ever used
+    pending_source: Optional[list] = None
 
     with open(input_file, 'r', errors='replace') as f:
-        for line in f:
-            line = line.rstrip('\n')
-
-            # Skip empty lines
-            if not line.strip():
-                continue
-
-            # Skip discriminator annotations (DWARF debug info)
-            if discriminator_pattern.match(line):
-                continue
-
-            # Section header
-            if section_pattern.match(line):
-                continue
-
-            # Function header
-            func_match = func_pattern.match(line)
-            if func_match:
-                # Save previous function
-                if current_func:
-                    files[current_file].append(current_func)
-
-                addr = int(func_match.group(1), 16)
-                name = func_match.group(2)
-                current_func = Function(name=name, address=addr)
-                current_source_block = None
-                pending_source_lines = []
-                continue
-
-            # Source file:line reference
-            file_match = file_line_pattern.match(line)
-            if file_match:
-                raw_path = file_match.group(1)
-                line_num = int(file_match.group(2))
-                rest = file_match.group(3) or ""
-
-                # Update current file for .c/.s files
-                if any(raw_path.endswith(ext) for ext in ['.c', '.s', '.S']):
-                    normalized = normalize_path(raw_path)
-                    if normalized != current_file and current_func:
-                        # Save function to old file, start fresh
-                        files[current_file].append(current_func)
-                        current_func = Function(name=current_func.name, address=current_func.address)
-                    current_file = normalized
-
-                # Store as pending source (text comes on next line usually, or is inline)
-                source_text = rest.strip() if rest.strip() else ""
-                # Strip discriminator annotations from inline text
-                source_text = re.sub(r'\s*\(discriminator\s+\d+\)', '', source_text)
-                pending_source_lines.append((normalize_path(raw_path), line_num, source_text))
-                continue
-
-            # Assembly instruction
-            asm_match = asm_pattern.match(line)
-            if asm_match and current_func:
-                addr = int(asm_match.group(1), 16)
-                hex_bytes = asm_match.group(2).strip()
-                instr = asm_match.group(3)
-
-                asm_line = AsmLine(
-                    address=addr,
-                    hex_bytes=hex_bytes,
-                    instruction=instr,
-                    raw_line=line
-                )
-
-                # If we have pending source, create a new source block
-                if pending_source_lines:
-                    # Use the most recent source reference
-                    src_file, src_line, src_text = pending_source_lines[-1]
-                    # Preserve original indentation from source file
-                    current_source_block = SourceBlock(
-                        file_path=src_file,
-                        line_number=src_line,
-                        source_text=src_text
-                    )
-                    current_func.source_blocks.append(current_source_block)
-                    pending_source_lines = []
-
-                # Add asm to current source block
-                if current_source_block:
-                    current_source_block.asm_lines.append(asm_line)
-                else:
-                    # No source context yet, create an orphan block
-                    current_source_block = SourceBlock(
-                        file_path=current_file,
-                        line_number=0,
-                        source_text=""
-                    )
-                    current_source_block.asm_lines.append(asm_line)
-                    current_func.source_blocks.append(current_source_block)
-                continue
-
-            # Source code line - any line not matched by patterns above is source text
-            # (indented C source, comments, etc.)
-            # Preserve the line as-is to maintain indentation; we'll dedent later
-            if current_func and line.strip():
-                # If we have a pending source reference, append this text to it
-                if pending_source_lines:
-                    file_path, line_num, existing_text = pending_source_lines[-1]
-                    if existing_text:
-                        # Append to existing (multiline source)
-                        pending_source_lines[-1] = (file_path, line_num, existing_text + '\n' + line)
-                    else:
-                        pending_source_lines[-1] = (file_path, line_num, line)
-                elif current_source_block and not current_source_block.source_text:
-                    # No pending, but current block has no text - use this
-                    current_source_block.source_text = line
+        for block in read_line_blocks(f):
+            for m in OBJDUMP_LINE_PATTERN.finditer(block):
+                kind = m.lastgroup
+
+                # Assembly instruction (by far the most common line)
+                if kind == 'instr':
+                    if not current_func or skipping:
+                        continue
+                    addr, hex_bytes, instr = m.group('asm_addr', 'hex', 'instr')
+
+                    # If we have pending source, create a new source block
+                    if pending_source:
+                        # Use the most recent source reference
+                        src_file, src_line, src_parts = pending_source
+                        # Preserve original indentation from source file
+                        current_source_block = SourceBlock(
+                            file_path=src_file,
+                            line_number=src_line,
+                            source_text='\n'.join(src_parts)
+                        )
+                        current_func.source_blocks.append(current_source_block)
+                        pending_source = None
+
+                    if not current_source_block:
+                        # No source context yet, create an orphan block
+                        current_source_block = SourceBlock(
+                            file_path=current_file,
+                            line_number=0,
+                            source_text=""
+                        )
+                        current_func.source_blocks.append(current_source_block)
+
+                    # Add asm to current source block
+                    current_source_block.addresses.append(format_address(addr))
+                    current_source_block.hex_bytes.append(hex_bytes.strip())
+                    current_source_block.instructions.append(instr)
+
+                # Function header
+                elif kind == 'func_name':
+                    # Save previous function
+                    if current_func and not skipping:
+                        yield current_file, current_func
+
+                    addr, name = m.group('func_addr', 'func_name')
+                    current_func = Function(name=name, address=format_address(addr))
+                    current_source_block = None
+                    pending_source = None
+
+                # Source file:line reference ('rest' when there is inline text)
+                elif kind == 'line_num' or kind == 'rest':
+                    raw_path, line_num, rest = m.group('path', 'line_num', 'rest')
+                    line_num = int(line_num)
+                    rest = rest or ""
+
+                    # Update current file for .c/.s files
+                    if raw_path.endswith(SOURCE_EXTENSIONS):
+                        normalized = normalize_path(raw_path)
+                        if normalized != current_file:
+                            if current_func:
+                                # Save function to old file, start fresh
+                                if not skipping:
+                                    yield current_file, current_func
+                                current_func = Function(name=current_func.name, address=current_func.address)
+                            if keep_file is not None:
+                                skipping = not keep_file(normalized)
+                        current_file = normalized
+
+                    # Store as pending source (text comes on next line usually, or is inline)
+                    source_text = rest.strip() if rest.strip() else ""
+                    # Strip discriminator annotations from inline text
+                    if '(discriminator' in source_text:
+                        source_text = DISCRIMINATOR_SUFFIX_PATTERN.sub('', source_text)
+                    pending_source = [normalize_path(raw_path), line_num, [source_text] if source_text else []]
+
+                # Source code line - any line not matched by patterns above is source text
+                # (indented C source, comments, etc.)
+                # Preserve the line as-is to maintain indentation; we'll dedent later
+                elif kind == 'text' and current_func and not skipping:
+                    line = m.group('text')
+                    # Skip empty lines
+                    if not line.strip():
+                        continue
+                    # If we have a pending source reference, append this text to it
+                    # (multiline source is joined once the block is created)
+                    if pending_source:
+                        pending_source[2].append(line)
+                    elif current_source_block and not current_source_block.source_text:
+                        # No pending, but current block has no text - use this
+                        current_source_block.source_text = line
+
+                # Discriminator annotations and section headers are skipped
 
     # Don't forget last function
-    if current_func:
-        files[current_file].append(current_func)
-
-    return dict(files)
-
-
-def generate_html(filename: str, functions: list[Function], all_files: list[str], binary_name: str,
-                  profile: Optional[ProfileData] = None) -> str:
-    """Generate HTML with dual-view support."""
-
-    # Build sidebar
-    sidebar_items = []
-    for f in sorted(all_files):
-        display = "(unknown)" if f == "_unknown_" else get_display_name(f)
-        href = ("_unknown_" if f == "_unknown_" else get_display_name(f)) + ".html"
-        is_current = (f == filename)
-        class_attr = ' class="current"' if is_current else ''
-        sidebar_items.append(f'<a href="{href}"{class_attr}>{html.escape(display)}</a>')
-
-    sidebar_html = '\n'.join(sidebar_items)
-
-    # Build function data for JavaScript
-    functions_json = []
-    for func in functions:
-        blocks = []
-        for sb in func.source_blocks:
-            asm_data = []
-            for asm in sb.asm_lines:
-                asm_data.append({
-                    'addr': f'{asm.address:08x}',
-                    'hex': asm.hex_bytes,
-                    'instr': asm.instruction,
-                    'cycles': asm.cycles
-                })
-            blocks.append({
-                'file': sb.file_path,
-                'line': sb.line_number,
-                'src': sb.source_text,
-                'asm': asm_data
-            })
-        functions_json.append({
-            'name': func.name,
-            'addr': f'{func.address:08x}',
-            'blocks': blocks
-        })
-
-    display_name = get_display_name(filename) if filename != "_unknown_" else "(unknown source)"
-
-    # Profile data for JavaScript
-    has_profile_json = 'true' if profile else 'false'
-    total_cycles_json = str(profile.total_cycles) if profile else '0'
-
-    return f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{html.escape(display_name)} - Disassembly Explorer</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-
-        /* === Premium Dark Design System === */
-        :root {{
-            /* Layered backgrounds */
-            --bg-body: #0A0A0B;
-            --bg-surface: #161618;
-            --bg-highlight: #232326;
-
-            /* Borders */
-            --border-subtle: #333333;
-            --border-hover: #555555;
-            --border-column: #2A2A2D;
-
-            /* Text colors */
-            --text-primary: #FFFFFF;
-            --text-secondary: #A1A1AA;
-            --text-tertiary: #71717A;
-            --text-dim: #52525B;
+    if current_func and not skipping:
+        yield current_file, current_func
 
-            /* Accent */
-            --accent-green: #22C55E;
-            --accent-blue: #3B82F6;
 
-            /* Selection */
-            --selection-bg: rgba(59, 130, 246, 0.1);
-            --selection-border: var(--accent-blue);
+class AsmEncoder:
+    """Encode parsed functions into the FUNCTIONS shape the page script reads.
 
-            /* GitHub Dark Dimmed syntax colors (softer pastels) */
-            --syntax-function: #8DDB8C;
-            --syntax-keyword: #A5D6FF;
-            --syntax-string: #96D0FF;
-            --syntax-comment: #768390;
-            --syntax-number: #F0B27A;
-            --syntax-register: #D2A8FF;
+    Instruction text repeats heavily within a file, so each distinct string
+    is stored once in `instructions` (text -> index, in first-seen order) and
+    asm lines refer to it by index. Use one encoder per page.
 
-            /* Heat map colors */
-            --heat-hot: #F87171;
-            --heat-warm: #FBBF24;
+    The JSON is written out as fragments rather than built as dicts and
+    lists for json to walk: the shape is fixed, and addresses and hex bytes
+    are plain hex digits that need no escaping.
 
-            /* Fonts */
-            --font-sans: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            --font-mono: 'JetBrains Mono', 'SF Mono', Monaco, Consolas, monospace;
-        }}
+    Function names, source paths and source text are HTML-escaped here, once,
+    so the page script can drop them straight into its markup.
+    """
 
-        body {{
-            font-family: var(--font-sans);
-            display: flex;
-            height: 100vh;
-            background: var(--bg-body);
-            color: var(--text-secondary);
-            -webkit-font-smoothing: antialiased;
-            -moz-osx-font-smoothing: grayscale;
-        }}
+    def __init__(self):
+        self.instructions: dict[str, int] = {}
+
+    def encode(self, func: Function) -> str:
+        instructions = self.instructions
+        parts = ['{"name":', encode_basestring_ascii(html.escape(func.name, quote=False)), ',"addr":"', func.address, '","blocks":[']
+        for i, block in enumerate(func.source_blocks):
+            if i:
+                parts.append(',')
+            parts += ('{"file":', encode_basestring_ascii(html.escape(block.file_path, quote=False)),
+                      ',"line":', str(block.line_number),
+                      ',"src":', encode_basestring_ascii(html.escape(block.source_text, quote=False)),
+                      ',"asm":[')
+            # Positional, one per instruction: [addr, hex, instr index, cycles]
+            asm = []
+            for address, hex_bytes, instr, cycles in zip(block.addresses, block.hex_bytes, block.instructions,
+                                                         block.cycles or repeat(0)):
+                instr_id = instructions.get(instr)
+                if instr_id is None:
+                    instr_id = instructions[instr] = len(instructions)
+                asm.append(f'["{address}","{hex_bytes}",{instr_id},{cycles}]')
+            parts += (','.join(asm), ']}')
+        parts.append(']}')
+        return ''.join(parts)
+
+
+# Stylesheet and script shared by every per-file page; main writes them once
+# next to the pages instead of inlining them into each one.
+STYLE_CSS = '''* { box-sizing: border-box; margin: 0; padding: 0; }
+
+/* === Premium Dark Design System === */
+:root {
+    /* Layered backgrounds */
+    --bg-body: #0A0A0B;
+    --bg-surface: #161618;
+    --bg-highlight: #232326;
+
+    /* Borders */
+    --border-subtle: #333333;
+    --border-hover: #555555;
+    --border-column: #2A2A2D;
+
+    /* Text colors */
+    --text-primary: #FFFFFF;
+    --text-secondary: #A1A1AA;
+    --text-tertiary: #71717A;
+    --text-dim: #52525B;
+
+    /* Accent */
+    --accent-green: #22C55E;
+    --accent-blue: #3B82F6;
+
+    /* Selection */
+    --selection-bg: rgba(59, 130, 246, 0.1);
+    --selection-border: var(--accent-blue);
+
+    /* GitHub Dark Dimmed syntax colors (softer pastels) */
+    --syntax-function: #8DDB8C;
+    --syntax-keyword: #A5D6FF;
+    --syntax-string: #96D0FF;
+    --syntax-comment: #768390;
+    --syntax-number: #F0B27A;
+    --syntax-register: #D2A8FF;
+
+    /* Heat map colors */
+    --heat-hot: #F87171;
+    --heat-warm: #FBBF24;
+
+    /* Fonts */
+    --font-sans: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    --font-mono: 'JetBrains Mono', 'SF Mono', Monaco, Consolas, monospace;
+}
+
+body {
+    font-family: var(--font-sans);
+    display: flex;
+    height: 100vh;
+    background: var(--bg-body);
+    color: var(--text-secondary);
+    -webkit-font-smoothing: antialiased;
+    -moz-osx-font-smoothing: grayscale;
+}
+
+/* === Sidebar (File Navigator) === */
+.sidebar {
+    width: 200px;
+    background: var(--bg-surface);
+    border-right: 1px solid var(--border-subtle);
+    overflow-y: auto;
+    padding: 0;
+    flex-shrink: 0;
+}
+.sidebar-header {
+    padding: 12px 16px;
+    font-size: 10px;
+    font-weight: 500;
+    color: var(--text-tertiary);
+    text-transform: uppercase;
+    letter-spacing: 0.1em;
+    border-bottom: 1px solid var(--border-subtle);
+}
+.sidebar a {
+    display: block;
+    padding: 6px 16px;
+    color: var(--text-secondary);
+    text-decoration: none;
+    font-size: 12px;
+    font-family: var(--font-mono);
+    border-left: 2px solid transparent;
+    transition: all 0.15s ease;
+}
+.sidebar a:hover {
+    background: var(--bg-highlight);
+    color: var(--text-primary);
+}
+.sidebar a.current {
+    background: var(--selection-bg);
+    color: var(--text-primary);
+    border-left-color: var(--accent-green);
+}
+.sidebar a.hidden { display: none; }
+.search {
+    padding: 8px 12px;
+    border-bottom: 1px solid var(--border-subtle);
+}
+.search input {
+    width: 100%;
+    padding: 8px 12px;
+    background: var(--bg-highlight);
+    border: 1px solid var(--border-subtle);
+    border-radius: 6px;
+    color: var(--text-primary);
+    font-size: 12px;
+    font-family: var(--font-mono);
+    transition: border-color 0.15s ease;
+}
+.search input:focus {
+    outline: none;
+    border-color: var(--text-tertiary);
+}
+.search input::placeholder { color: var(--text-dim); }
+
+/* === Main Content Area === */
+.main {
+    flex: 1;
+    display: flex;
+    flex-direction: column;
+    overflow: hidden;
+    background: var(--bg-body);
+}
+
+/* === Toolbar === */
+.toolbar {
+    height: 44px;
+    min-height: 44px;
+    background: var(--bg-surface);
+    padding: 0 16px;
+    display: flex;
+    align-items: center;
+    gap: 16px;
+    border-bottom: 1px solid var(--border-subtle);
+}
+
+/* Breadcrumb */
+.breadcrumb {
+    display: flex;
+    align-items: center;
+    gap: 8px;
+    font-size: 13px;
+    font-family: var(--font-sans);
+    color: var(--text-secondary);
+}
+.breadcrumb-sep {
+    color: var(--text-dim);
+    font-size: 10px;
+}
+.breadcrumb-item {
+    color: var(--text-tertiary);
+}
+.breadcrumb-item.current {
+    color: var(--text-primary);
+    font-weight: 500;
+}
+
+/* Segmented Control */
+.segmented-control {
+    display: flex;
+    background: var(--bg-highlight);
+    border-radius: 8px;
+    padding: 3px;
+    margin-left: auto;
+    border: 1px solid var(--border-subtle);
+}
+.segmented-control button {
+    background: transparent;
+    border: none;
+    color: var(--text-tertiary);
+    padding: 6px 14px;
+    font-size: 12px;
+    font-weight: 500;
+    font-family: var(--font-sans);
+    cursor: pointer;
+    border-radius: 6px;
+    transition: all 0.15s ease;
+}
+.segmented-control button:hover {
+    color: var(--text-secondary);
+}
+.segmented-control button.active {
+    background: var(--bg-surface);
+    color: var(--text-primary);
+    box-shadow: 0 1px 3px rgba(0,0,0,0.3);
+}
+
+.toolbar-checkbox {
+    display: flex;
+    align-items: center;
+    gap: 6px;
+    font-size: 12px;
+    color: var(--text-tertiary);
+    margin-left: 12px;
+}
+.toolbar-checkbox input {
+    accent-color: var(--accent-green);
+}
+
+/* === Content Area === */
+.content {
+    flex: 1;
+    overflow: auto;
+    padding: 0;
+    background: var(--bg-body);
+}
+
+/* === Function Block === */
+.function {
+    border-bottom: 1px solid var(--border-subtle);
+}
+.func-header {
+    background: var(--bg-surface);
+    padding: 8px 16px;
+    font-family: var(--font-mono);
+    font-size: 12px;
+    line-height: 1.4;
+    color: var(--syntax-function);
+    font-weight: 500;
+    position: sticky;
+    top: 0;
+    z-index: 10;
+    border-bottom: 1px solid var(--border-subtle);
+}
+.func-header .addr {
+    color: var(--text-dim);
+    font-weight: 400;
+    margin-right: 12px;
+}
+
+/* === Source Line (Section Header) === */
+.source-line {
+    background: var(--bg-highlight);
+    padding: 4px 0;
+    font-family: var(--font-mono);
+    font-size: 12px;
+    line-height: 1.4;
+    cursor: pointer;
+    display: grid;
+    grid-template-columns: 20px 120px 1fr;
+    align-items: start;
+    border-bottom: 1px solid var(--border-subtle);
+    border-left: 3px solid transparent;
+    transition: all 0.1s ease;
+}
+.source-line.has-profile {
+    grid-template-columns: 20px 70px 120px 1fr;
+}
+.source-line:hover {
+    background: var(--bg-surface);
+}
+.source-line.selected {
+    background: var(--selection-bg) !important;
+    border-left-color: var(--selection-border);
+}
+.source-line .toggle {
+    color: var(--text-dim);
+    text-align: center;
+    font-size: 10px;
+    padding-top: 2px;
+}
+.source-line .toggle.expandable::before { content: '\\25B8'; }
+.content.expand-all .source-line .toggle.expandable::before { content: '\\25BE'; }
+.source-line .cycles {
+    color: var(--text-tertiary);
+    text-align: right;
+    padding-right: 12px;
+    border-right: 1px solid var(--border-column);
+}
+.source-line .cycles.hot {
+    color: var(--heat-hot);
+    font-weight: 500;
+}
+.source-line .cycles.warm {
+    color: var(--heat-warm);
+}
+.source-line .line-num {
+    color: var(--text-dim);
+    text-align: right;
+    padding-right: 12px;
+    border-right: 1px solid var(--border-column);
+    user-select: none;
+}
+.source-line .code {
+    color: var(--text-primary);
+    font-weight: 500;
+    white-space: pre;
+    overflow: hidden;
+    text-overflow: ellipsis;
+    padding-left: 12px;
+}
+
+/* === Assembly Grid Layout (Spreadsheet Style) === */
+.asm-line {
+    display: grid;
+    grid-template-columns: 80px 100px 1fr;
+    padding: 3px 0;
+    font-family: var(--font-mono);
+    font-size: 12px;
+    line-height: 1.4;
+    border-bottom: 1px solid var(--border-column);
+    background: var(--bg-body);
+    border-left: 3px solid transparent;
+    transition: all 0.1s ease;
+}
+.asm-line.has-profile {
+    grid-template-columns: 80px 70px 100px 1fr;
+}
+.asm-line:hover {
+    background: var(--bg-surface);
+}
+.asm-line.selected {
+    background: var(--selection-bg) !important;
+    border-left-color: var(--selection-border);
+}
+.asm-line .addr {
+    color: var(--text-dim);
+    text-align: right;
+    padding-right: 12px;
+    border-right: 1px solid var(--border-column);
+}
+.asm-line .cycles {
+    color: var(--text-tertiary);
+    text-align: right;
+    padding-right: 12px;
+    border-right: 1px solid var(--border-column);
+}
+.asm-line .cycles.hot {
+    color: var(--heat-hot);
+    font-weight: 500;
+}
+.asm-line .cycles.warm {
+    color: var(--heat-warm);
+}
+.asm-line .hex {
+    color: var(--text-dim);
+    padding-right: 12px;
+    border-right: 1px solid var(--border-column);
+}
+.asm-line .instr {
+    color: var(--text-secondary);
+    padding-left: 12px;
+}
+
+/* === Block Containers === */
+.block { margin: 0; }
+.asm-group { }
+.source-group { }
+/* Groups follow "Expand all" (.expand-all on .content) unless individually
+   flipped with toggleBlock (.toggled), so changing it is one class write */
+.content:not(.expand-all) .asm-group:not(.toggled),
+.content.expand-all .asm-group.toggled,
+.content:not(.expand-all) .source-group:not(.toggled),
+.content.expand-all .source-group.toggled { display: none; }
+
+.asm-block {
+    cursor: pointer;
+}
+
+/* === View Modes === */
+.view-source .asm-group { }
+.view-machine .source-group { background: var(--bg-highlight); }
+
+/* === Row Selection (full edge-to-edge) === */
+.content *:focus {
+    outline: none;
+}
+
+/* === Mobile Sidebar Toggle === */
+.sidebar-toggle {
+    display: none;
+    background: transparent;
+    border: none;
+    color: var(--text-secondary);
+    cursor: pointer;
+    padding: 8px;
+    margin-right: 8px;
+    border-radius: 6px;
+    transition: all 0.15s ease;
+}
+.sidebar-toggle:hover {
+    background: var(--bg-highlight);
+    color: var(--text-primary);
+}
+.sidebar-toggle svg {
+    display: block;
+    width: 20px;
+    height: 20px;
+}
+
+/* Overlay for mobile when sidebar is open */
+.sidebar-overlay {
+    display: none;
+    position: fixed;
+    inset: 0;
+    background: rgba(0, 0, 0, 0.5);
+    z-index: 99;
+}
+
+/* === Mobile Responsive === */
+@media (max-width: 768px) {
+    .sidebar {
+        position: fixed;
+        left: 0;
+        top: 0;
+        height: 100vh;
+        z-index: 100;
+        transform: translateX(-100%);
+        transition: transform 0.25s ease;
+    }
+    .sidebar.open {
+        transform: translateX(0);
+    }
+    .sidebar-overlay.open {
+        display: block;
+    }
+    .sidebar-toggle {
+        display: block;
+    }
+    .breadcrumb-item:not(.current) {
+        display: none;
+    }
+    .breadcrumb-sep {
+        display: none;
+    }
+    .segmented-control button {
+        padding: 6px 10px;
+        font-size: 11px;
+    }
+    .toolbar-checkbox {
+        font-size: 11px;
+    }
+}
+'''
 
-        /* === Sidebar (File Navigator) === */
-        .sidebar {{
-            width: 200px;
-            background: var(--bg-surface);
-            border-right: 1px solid var(--border-subtle);
-            overflow-y: auto;
-            padding: 0;
-            flex-shrink: 0;
-        }}
-        .sidebar-header {{
-            padding: 12px 16px;
-            font-size: 10px;
-            font-weight: 500;
-            color: var(--text-tertiary);
-            text-transform: uppercase;
-            letter-spacing: 0.1em;
-            border-bottom: 1px solid var(--border-subtle);
-        }}
-        .sidebar a {{
-            display: block;
-            padding: 6px 16px;
-            color: var(--text-secondary);
-            text-decoration: none;
-            font-size: 12px;
-            font-family: var(--font-mono);
-            border-left: 2px solid transparent;
-            transition: all 0.15s ease;
-        }}
-        .sidebar a:hover {{
-            background: var(--bg-highlight);
-            color: var(--text-primary);
-        }}
-        .sidebar a.current {{
-            background: var(--selection-bg);
-            color: var(--text-primary);
-            border-left-color: var(--accent-green);
-        }}
-        .search {{
-            padding: 8px 12px;
-            border-bottom: 1px solid var(--border-subtle);
-        }}
-        .search input {{
-            width: 100%;
-            padding: 8px 12px;
-            background: var(--bg-highlight);
-            border: 1px solid var(--border-subtle);
-            border-radius: 6px;
-            color: var(--text-primary);
-            font-size: 12px;
-            font-family: var(--font-mono);
-            transition: border-color 0.15s ease;
-        }}
-        .search input:focus {{
-            outline: none;
-            border-color: var(--text-tertiary);
-        }}
-        .search input::placeholder {{ color: var(--text-dim); }}
+APP_JS = '''// FUNCTIONS (defined by the page) is a list of
+//   {name, addr, blocks: [{file, line, src, asm: [[addr, hex, instrId, cycles], ...]}]}
+// with asm lines as positional arrays to keep the payload small. instrId
+// indexes INSTRUCTIONS, the page's table of distinct instruction text.
+// Names, paths, source text and instructions arrive HTML-escaped by the generator.
+let currentView = 'source';
+let expandAll = true;
 
-        /* === Main Content Area === */
-        .main {{
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            overflow: hidden;
-            background: var(--bg-body);
-        }}
+function formatCycles(n) {
+    if (n === 0) return '';
+    if (n >= 1e9) return (n/1e9).toFixed(1) + 'B';
+    if (n >= 1e6) return (n/1e6).toFixed(1) + 'M';
+    if (n >= 1e3) return (n/1e3).toFixed(1) + 'K';
+    return n.toString();
+}
 
-        /* === Toolbar === */
-        .toolbar {{
-            height: 44px;
-            min-height: 44px;
-            background: var(--bg-surface);
-            padding: 0 16px;
-            display: flex;
-            align-items: center;
-            gap: 16px;
-            border-bottom: 1px solid var(--border-subtle);
-        }}
+function getCycleClass(cycles) {
+    if (!HAS_PROFILE || cycles === 0) return '';
+    const pct = cycles / TOTAL_CYCLES;
+    if (pct >= 0.01) return 'hot';    // >= 1% of total
+    if (pct >= 0.001) return 'warm';  // >= 0.1% of total
+    return '';
+}
+
+// Cycle counts repeat a lot (most are 0), so each count's cell is built once
+const cyclesCellCache = new Map();
+
+function cyclesCell(cycles) {
+    let cell = cyclesCellCache.get(cycles);
+    if (cell === undefined) {
+        cell = `<span class="cycles ${getCycleClass(cycles)}">${formatCycles(cycles)}</span>`;
+        cyclesCellCache.set(cycles, cell);
+    }
+    return cell;
+}
+
+function renderSourceFunction(func) {
+    let html = `<div class="function">`;
+    html += `<div class="func-header"><span class="addr">${func.addr}</span>${func.name}</div>`;
+
+    // Group blocks by source line number and merge assembly
+    // This handles compiler instruction reordering (GCC -O2)
+    const lineMap = new Map();  // line -> {src, file, asm: []}
+    const noLineAsm = [];       // assembly without source attribution
+
+    for (const block of func.blocks) {
+        if (block.line > 0) {
+            const key = block.line;
+            if (!lineMap.has(key)) {
+                lineMap.set(key, {
+                    src: block.src,
+                    file: block.file,
+                    line: block.line,
+                    asm: []
+                });
+            }
+            // Merge assembly from duplicate source lines
+            for (const a of block.asm) {
+                lineMap.get(key).asm.push(a);
+            }
+        } else {
+            // No source line - collect separately
+            for (const a of block.asm) {
+                noLineAsm.push(a);
+            }
+        }
+    }
+
+    // Sort by line number
+    const sortedBlocks = Array.from(lineMap.values()).sort((a, b) => a.line - b.line);
+
+    // Sort assembly within each block by address (machine order)
+    for (const block of sortedBlocks) {
+        block.asm.sort((a, b) => {
+            const addrA = parseInt(a[0], 16);
+            const addrB = parseInt(b[0], 16);
+            return addrA - addrB;
+        });
+    }
+
+    // Render assembly without source attribution first (e.g., function prologue)
+    if (noLineAsm.length > 0) {
+        const blockId = `${func.addr}-nosrc`;
+        const blockCycles = noLineAsm.reduce((sum, a) => sum + a[3], 0);
+        const profileClass = HAS_PROFILE ? 'has-profile' : '';
+
+        html += `<div class="block">`;
+        html += `<div class="source-line ${profileClass}" data-toggle="${blockId}" tabindex="0">`;
+        html += `<span class="toggle expandable"></span>`;
+        if (HAS_PROFILE) {
+            html += cyclesCell(blockCycles);
+        }
+        html += `<span class="line-num"></span>`;
+        html += `<span class="code" style="color: var(--text-muted); font-style: italic;">(no source)</span>`;
+        html += `</div>`;
+        html += `<div class="asm-group" id="${blockId}">`;
+        for (const [addr, hex, instrId, cycles] of noLineAsm) {
+            // One append per line; these loops run once per instruction
+            const cyclesHtml = HAS_PROFILE ? cyclesCell(cycles) : '';
+            html += `<div class="asm-line ${profileClass}" tabindex="0"><span class="addr">${addr}</span>${cyclesHtml}` +
+                `<span class="hex">${hex}</span><span class="instr">${INSTRUCTIONS[instrId]}</span></div>`;
+        }
+        html += `</div></div>`;
+    }
+
+    // Render sorted source blocks
+    for (let i = 0; i < sortedBlocks.length; i++) {
+        const block = sortedBlocks[i];
+        const blockId = `${func.addr}-${block.line}`;
+        const hasAsm = block.asm.length > 0;
+
+        // Calculate total cycles for this source block
+        const blockCycles = block.asm.reduce((sum, a) => sum + a[3], 0);
+
+        html += `<div class="block">`;
+
+        // Source line (section header style)
+        const profileClass = HAS_PROFILE ? 'has-profile' : '';
+        html += `<div class="source-line ${profileClass}" data-toggle="${blockId}" tabindex="0">`;
+        html += hasAsm ? `<span class="toggle expandable"></span>` : `<span class="toggle"></span>`;
+        if (HAS_PROFILE) {
+            html += cyclesCell(blockCycles);
+        }
+        html += `<span class="line-num">${block.line}</span>`;
+        html += `<span class="code">${block.src}</span>`;
+        html += `</div>`;
 
-        /* Breadcrumb */
-        .breadcrumb {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            font-size: 13px;
-            font-family: var(--font-sans);
-            color: var(--text-secondary);
-        }}
-        .breadcrumb-sep {{
-            color: var(--text-dim);
-            font-size: 10px;
-        }}
-        .breadcrumb-item {{
-            color: var(--text-tertiary);
-        }}
-        .breadcrumb-item.current {{
-            color: var(--text-primary);
-            font-weight: 500;
-        }}
+        // Assembly lines (grid layout)
+        if (hasAsm) {
+            html += `<div class="asm-group" id="${blockId}">`;
+            for (const [addr, hex, instrId, cycles] of block.asm) {
+                const cyclesHtml = HAS_PROFILE ? cyclesCell(cycles) : '';
+                html += `<div class="asm-line ${profileClass}" tabindex="0"><span class="addr">${addr}</span>${cyclesHtml}` +
+                    `<span class="hex">${hex}</span><span class="instr">${INSTRUCTIONS[instrId]}</span></div>`;
+            }
+            html += `</div>`;
+        }
 
-        /* Segmented Control */
-        .segmented-control {{
-            display: flex;
-            background: var(--bg-highlight);
-            border-radius: 8px;
-            padding: 3px;
-            margin-left: auto;
-            border: 1px solid var(--border-subtle);
-        }}
-        .segmented-control button {{
-            background: transparent;
-            border: none;
-            color: var(--text-tertiary);
-            padding: 6px 14px;
-            font-size: 12px;
-            font-weight: 500;
-            font-family: var(--font-sans);
-            cursor: pointer;
-            border-radius: 6px;
-            transition: all 0.15s ease;
-        }}
-        .segmented-control button:hover {{
-            color: var(--text-secondary);
-        }}
-        .segmented-control button.active {{
-            background: var(--bg-surface);
-            color: var(--text-primary);
-            box-shadow: 0 1px 3px rgba(0,0,0,0.3);
-        }}
+        html += `</div>`;
+    }
+    html += `</div>`;
+    return html;
+}
 
-        .toolbar-checkbox {{
-            display: flex;
-            align-items: center;
-            gap: 6px;
-            font-size: 12px;
-            color: var(--text-tertiary);
-            margin-left: 12px;
-        }}
-        .toolbar-checkbox input {{
-            accent-color: var(--accent-green);
-        }}
+function renderMachineFunction(func) {
+    let html = `<div class="function">`;
+    html += `<div class="func-header"><span class="addr">${func.addr}</span>${func.name}</div>`;
 
-        /* === Content Area === */
-        .content {{
-            flex: 1;
-            overflow: auto;
-            padding: 0;
-            background: var(--bg-body);
-        }}
+    for (let i = 0; i < func.blocks.length; i++) {
+        const block = func.blocks[i];
+        const blockId = `m-${func.addr}-${i}`;
+        const hasSrc = block.src || block.line > 0;
 
-        /* === Function Block === */
-        .function {{
-            border-bottom: 1px solid var(--border-subtle);
-        }}
-        .func-header {{
-            background: var(--bg-surface);
-            padding: 8px 16px;
-            font-family: var(--font-mono);
-            font-size: 12px;
-            line-height: 1.4;
-            color: var(--syntax-function);
-            font-weight: 500;
-            position: sticky;
-            top: 0;
-            z-index: 10;
-            border-bottom: 1px solid var(--border-subtle);
-        }}
-        .func-header .addr {{
-            color: var(--text-dim);
-            font-weight: 400;
-            margin-right: 12px;
-        }}
+        html += `<div class="block asm-primary">`;
 
-        /* === Source Line (Section Header) === */
-        .source-line {{
-            background: var(--bg-highlight);
-            padding: 4px 0;
-            font-family: var(--font-mono);
-            font-size: 12px;
-            line-height: 1.4;
-            cursor: pointer;
-            display: grid;
-            grid-template-columns: 20px 120px 1fr;
-            align-items: start;
-            border-bottom: 1px solid var(--border-subtle);
-            border-left: 3px solid transparent;
-            transition: all 0.1s ease;
-        }}
-        .source-line.has-profile {{
-            grid-template-columns: 20px 70px 120px 1fr;
-        }}
-        .source-line:hover {{
-            background: var(--bg-surface);
-        }}
-        .source-line.selected {{
-            background: var(--selection-bg) !important;
-            border-left-color: var(--selection-border);
-        }}
-        .source-line .toggle {{
-            color: var(--text-dim);
-            text-align: center;
-            font-size: 10px;
-            padding-top: 2px;
-        }}
-        .source-line .cycles {{
-            color: var(--text-tertiary);
-            text-align: right;
-            padding-right: 12px;
-            border-right: 1px solid var(--border-column);
-        }}
-        .source-line .cycles.hot {{
-            color: var(--heat-hot);
-            font-weight: 500;
-        }}
-        .source-line .cycles.warm {{
-            color: var(--heat-warm);
-        }}
-        .source-line .line-num {{
-            color: var(--text-dim);
-            text-align: right;
-            padding-right: 12px;
-            border-right: 1px solid var(--border-column);
-            user-select: none;
-        }}
-        .source-line .code {{
-            color: var(--text-primary);
-            font-weight: 500;
-            white-space: pre;
-            overflow: hidden;
-            text-overflow: ellipsis;
-            padding-left: 12px;
-        }}
+        // Assembly block (clickable to show source)
+        if (block.asm.length > 0) {
+            const profileClass = HAS_PROFILE ? 'has-profile' : '';
+            html += `<div class="asm-block" data-toggle="${blockId}">`;
+            for (const [addr, hex, instrId, cycles] of block.asm) {
+                const cyclesHtml = HAS_PROFILE ? cyclesCell(cycles) : '';
+                html += `<div class="asm-line ${profileClass}"><span class="addr">${addr}</span>${cyclesHtml}` +
+                    `<span class="hex">${hex}</span><span class="instr">${INSTRUCTIONS[instrId]}</span></div>`;
+            }
+            html += `</div>`;
+        }
 
-        /* === Assembly Grid Layout (Spreadsheet Style) === */
-        .asm-line {{
-            display: grid;
-            grid-template-columns: 80px 100px 1fr;
-            padding: 3px 0;
-            font-family: var(--font-mono);
-            font-size: 12px;
-            line-height: 1.4;
-            border-bottom: 1px solid var(--border-column);
-            background: var(--bg-body);
-            border-left: 3px solid transparent;
-            transition: all 0.1s ease;
-        }}
-        .asm-line.has-profile {{
-            grid-template-columns: 80px 70px 100px 1fr;
-        }}
-        .asm-line:hover {{
-            background: var(--bg-surface);
-        }}
-        .asm-line.selected {{
-            background: var(--selection-bg) !important;
-            border-left-color: var(--selection-border);
-        }}
-        .asm-line .addr {{
-            color: var(--text-dim);
-            text-align: right;
-            padding-right: 12px;
-            border-right: 1px solid var(--border-column);
-        }}
-        .asm-line .cycles {{
-            color: var(--text-tertiary);
-            text-align: right;
-            padding-right: 12px;
-            border-right: 1px solid var(--border-column);
-        }}
-        .asm-line .cycles.hot {{
-            color: var(--heat-hot);
-            font-weight: 500;
-        }}
-        .asm-line .cycles.warm {{
-            color: var(--heat-warm);
-        }}
-        .asm-line .hex {{
-            color: var(--text-dim);
-            padding-right: 12px;
-            border-right: 1px solid var(--border-column);
-        }}
-        .asm-line .instr {{
-            color: var(--text-secondary);
-            padding-left: 12px;
-        }}
+        // Source context
+        if (hasSrc) {
+            const blockCycles = block.asm.reduce((sum, a) => sum + a[3], 0);
+            const profileClass = HAS_PROFILE ? 'has-profile' : '';
+            // Only show first line of source in machine view (multi-line blocks look messy)
+            const firstLine = (block.src || '').split('\\n')[0];
+            html += `<div class="source-group" id="${blockId}">`;
+            html += `<div class="source-line ${profileClass}">`;
+            html += `<span class="toggle"></span>`;  // Empty toggle to match grid columns
+            if (HAS_PROFILE) {
+                html += cyclesCell(blockCycles);
+            }
+            html += `<span class="line-num">${block.file}:${block.line}</span>`;
+            html += `<span class="code">${firstLine}</span>`;
+            html += `</div>`;
+            html += `</div>`;
+        }
 
-        /* === Block Containers === */
-        .block {{ margin: 0; }}
-        .asm-group {{ }}
-        .asm-group.collapsed {{ display: none; }}
-        .source-group {{ }}
-        .source-group.collapsed {{ display: none; }}
+        html += `</div>`;
+    }
+    html += `</div>`;
+    return html;
+}
 
-        .asm-block {{
-            cursor: pointer;
-        }}
+function setView(view) {
+    currentView = view;
+    document.getElementById('btn-source').classList.toggle('active', view === 'source');
+    document.getElementById('btn-machine').classList.toggle('active', view === 'machine');
+    render();
+}
 
-        /* === View Modes === */
-        .view-source .asm-group {{ }}
-        .view-machine .source-group {{ background: var(--bg-highlight); }}
+function toggleBlock(id) {
+    const el = document.getElementById(id);
+    if (el) {
+        el.classList.toggle('toggled');
+    }
+}
+
+// One delegated listener toggles blocks for every rendered function
+document.getElementById('content').addEventListener('click', event => {
+    const target = event.target.closest('[data-toggle]');
+    if (target) {
+        toggleBlock(target.dataset.toggle);
+    }
+});
+
+function toggleExpandAll() {
+    expandAll = document.getElementById('expand-all').checked;
+    // Expansion is driven by a class on #content; clear per-block flips so
+    // every group follows the new setting, and resize the unrendered stubs
+    const content = document.getElementById('content');
+    content.classList.toggle('expand-all', expandAll);
+    for (const el of content.querySelectorAll('.toggled')) {
+        el.classList.remove('toggled');
+    }
+    for (const stub of content.querySelectorAll('.function-stub')) {
+        stub.style.height = estimateFunctionHeight(FUNCTIONS[stub.dataset.index], stub.dataset.view) + 'px';
+    }
+}
+
+// Rough rendered height of a function in `view`, from the row heights in
+// style.css, so a stub takes up about the same scroll space
+function estimateFunctionHeight(func, view) {
+    let asmLines = 0;
+    for (const block of func.blocks) {
+        asmLines += block.asm.length;
+    }
+    const sourceRows = view === 'source' || expandAll ? func.blocks.length : 0;
+    const asmRows = view === 'machine' || expandAll ? asmLines : 0;
+    return 34 + sourceRows * 26 + asmRows * 24;
+}
+
+// Functions start out as empty stubs and are rendered when they come within
+// a screen or so of the visible area, so the DOM only holds what has been
+// scrolled near rather than every line of a large file.
+const stubObserver = new IntersectionObserver(entries => {
+    for (const entry of entries) {
+        if (!entry.isIntersecting) continue;
+        const stub = entry.target;
+        stubObserver.unobserve(stub);
+        const renderFunction = stub.dataset.view === 'source' ? renderSourceFunction : renderMachineFunction;
+        stub.insertAdjacentHTML('beforebegin', renderFunction(FUNCTIONS[stub.dataset.index]));
+        stub.remove();
+    }
+}, { root: document.getElementById('content'), rootMargin: '1000px 0px' });
+
+// One container per view, created the first time that view is shown. They
+// all stay in the DOM and switching views only flips which one is hidden,
+// so toggling back and forth never rebuilds or re-parses the markup.
+let viewPanes = {};
+
+function render() {
+    const content = document.getElementById('content');
+    content.className = 'content view-' + currentView + (expandAll ? ' expand-all' : '');
+    if (!viewPanes[currentView]) {
+        const pane = document.createElement('div');
+        pane.innerHTML = FUNCTIONS.map((func, i) =>
+            `<div class="function-stub" data-view="${currentView}" data-index="${i}" ` +
+            `style="height: ${estimateFunctionHeight(func, currentView)}px"></div>`).join('');
+        content.appendChild(pane);
+        viewPanes[currentView] = pane;
+        for (const stub of pane.querySelectorAll('.function-stub')) {
+            stubObserver.observe(stub);
+        }
+    }
+    for (const [view, pane] of Object.entries(viewPanes)) {
+        pane.hidden = view !== currentView;
+    }
+}
+
+// Sidebar links with their lowercased names, for the filter
+const fileLinks = Array.from(document.querySelectorAll('#file-list a'),
+                             link => ({ link, name: link.textContent.toLowerCase() }));
+let filterTimer = 0;
+
+function filterFiles() {
+    // Debounced so a burst of keystrokes filters the list once
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => {
+        const query = document.getElementById('search').value.toLowerCase();
+        for (const { link, name } of fileLinks) {
+            link.classList.toggle('hidden', !name.includes(query));
+        }
+    }, 40);
+}
 
-        /* === Row Selection (full edge-to-edge) === */
-        .content *:focus {{
-            outline: none;
-        }}
+function toggleSidebar() {
+    document.getElementById('sidebar').classList.toggle('open');
+    document.getElementById('sidebar-overlay').classList.toggle('open');
+}
 
-        /* === Mobile Sidebar Toggle === */
-        .sidebar-toggle {{
-            display: none;
-            background: transparent;
-            border: none;
-            color: var(--text-secondary);
-            cursor: pointer;
-            padding: 8px;
-            margin-right: 8px;
-            border-radius: 6px;
-            transition: all 0.15s ease;
-        }}
-        .sidebar-toggle:hover {{
-            background: var(--bg-highlight);
-            color: var(--text-primary);
-        }}
-        .sidebar-toggle svg {{
-            display: block;
-            width: 20px;
-            height: 20px;
-        }}
+// The sidebar markup is shared by every page; highlight this page's entry
+const currentPage = decodeURIComponent(location.pathname.split('/').pop());
+for (const { link } of fileLinks) {
+    link.classList.toggle('current', link.getAttribute('href') === currentPage);
+}
 
-        /* Overlay for mobile when sidebar is open */
-        .sidebar-overlay {{
-            display: none;
-            position: fixed;
-            inset: 0;
-            background: rgba(0, 0, 0, 0.5);
-            z-index: 99;
-        }}
+// Initial render
+render();
+'''
 
-        /* === Mobile Responsive === */
-        @media (max-width: 768px) {{
-            .sidebar {{
-                position: fixed;
-                left: 0;
-                top: 0;
-                height: 100vh;
-                z-index: 100;
-                transform: translateX(-100%);
-                transition: transform 0.25s ease;
-            }}
-            .sidebar.open {{
-                transform: translateX(0);
-            }}
-            .sidebar-overlay.open {{
-                display: block;
-            }}
-            .sidebar-toggle {{
-                display: block;
-            }}
-            .breadcrumb-item:not(.current) {{
-                display: none;
-            }}
-            .breadcrumb-sep {{
-                display: none;
-            }}
-            .segmented-control button {{
-                padding: 6px 10px;
-                font-size: 11px;
-            }}
-            .toolbar-checkbox {{
-                font-size: 11px;
-            }}
-        }}
-    </style>
+# Per-file page, split around the FUNCTIONS JSON so it can be streamed
+# straight into the output file between the two halves. The JSON sits in a
+# non-executing script block and is read with JSON.parse, which engines
+# handle much faster than the same data as a JS literal.
+PAGE_HEAD_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{display_name} - Disassembly Explorer</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="style.css">
 </head>
 <body>
     <div class="sidebar-overlay" id="sidebar-overlay" onclick="toggleSidebar()"></div>
@@ -763,9 +1125,9 @@ def generate_html(filename: str, functions: list[Function], all_files: list[str]
                 </svg>
             </button>
             <div class="breadcrumb">
-                <span class="breadcrumb-item">{html.escape(binary_name)}</span>
+                <span class="breadcrumb-item">{binary_name}</span>
                 <span class="breadcrumb-sep">&#9656;</span>
-                <span class="breadcrumb-item current">{html.escape(display_name)}</span>
+                <span class="breadcrumb-item current">{display_name}</span>
             </div>
             <div class="segmented-control">
                 <button id="btn-source" class="active" onclick="setView('source')">Source Order</button>
@@ -780,276 +1142,69 @@ def generate_html(filename: str, functions: list[Function], all_files: list[str]
             <!-- Content rendered by JavaScript -->
         </div>
     </div>
-    <script>
-const FUNCTIONS = {json.dumps(functions_json)};
-const HAS_PROFILE = {has_profile_json};
-const TOTAL_CYCLES = {total_cycles_json};
-let currentView = 'source';
-let expandAll = true;
-
-function escapeHtml(text) {{
-    const div = document.createElement('div');
-    div.textContent = text;
-    return div.innerHTML;
-}}
-
-function formatCycles(n) {{
-    if (n === 0) return '';
-    if (n >= 1e9) return (n/1e9).toFixed(1) + 'B';
-    if (n >= 1e6) return (n/1e6).toFixed(1) + 'M';
-    if (n >= 1e3) return (n/1e3).toFixed(1) + 'K';
-    return n.toString();
-}}
-
-function getCycleClass(cycles) {{
-    if (!HAS_PROFILE || cycles === 0) return '';
-    const pct = cycles / TOTAL_CYCLES;
-    if (pct >= 0.01) return 'hot';    // >= 1% of total
-    if (pct >= 0.001) return 'warm';  // >= 0.1% of total
-    return '';
-}}
-
-function renderSourceView() {{
-    let html = '';
-    for (const func of FUNCTIONS) {{
-        html += `<div class="function">`;
-        html += `<div class="func-header"><span class="addr">${{func.addr}}</span>${{escapeHtml(func.name)}}</div>`;
-
-        // Group blocks by source line number and merge assembly
-        // This handles compiler instruction reordering (GCC -O2)
-        const lineMap = new Map();  // line -> {{src, file, asm: []}}
-        const noLineAsm = [];       // assembly without source attribution
-
-        for (const block of func.blocks) {{
-            if (block.line > 0) {{
-                const key = block.line;
-                if (!lineMap.has(key)) {{
-                    lineMap.set(key, {{
-                        src: block.src,
-                        file: block.file,
-                        line: block.line,
-                        asm: []
-                    }});
-                }}
-                // Merge assembly from duplicate source lines
-                for (const a of block.asm) {{
-                    lineMap.get(key).asm.push(a);
-                }}
-            }} else {{
-                // No source line - collect separately
-                for (const a of block.asm) {{
-                    noLineAsm.push(a);
-                }}
-            }}
-        }}
-
-        // Sort by line number
-        const sortedBlocks = Array.from(lineMap.values()).sort((a, b) => a.line - b.line);
-
-        // Sort assembly within each block by address (machine order)
-        for (const block of sortedBlocks) {{
-            block.asm.sort((a, b) => {{
-                const addrA = parseInt(a.addr, 16);
-                const addrB = parseInt(b.addr, 16);
-                return addrA - addrB;
-            }});
-        }}
-
-        // Render assembly without source attribution first (e.g., function prologue)
-        if (noLineAsm.length > 0) {{
-            const blockId = `${{func.addr}}-nosrc`;
-            const expanded = expandAll ? '' : 'collapsed';
-            const blockCycles = noLineAsm.reduce((sum, a) => sum + (a.cycles || 0), 0);
-            const profileClass = HAS_PROFILE ? 'has-profile' : '';
-            const cycleClass = getCycleClass(blockCycles);
-
-            html += `<div class="block">`;
-            html += `<div class="source-line ${{profileClass}}" onclick="toggleBlock('${{blockId}}')" tabindex="0">`;
-            html += `<span class="toggle">${{expandAll ? '&#9662;' : '&#9656;'}}</span>`;
-            if (HAS_PROFILE) {{
-                html += `<span class="cycles ${{cycleClass}}">${{formatCycles(blockCycles)}}</span>`;
-            }}
-            html += `<span class="line-num"></span>`;
-            html += `<span class="code" style="color: var(--text-muted); font-style: italic;">(no source)</span>`;
-            html += `</div>`;
-            html += `<div class="asm-group ${{expanded}}" id="${{blockId}}">`;
-            for (const asm of noLineAsm) {{
-                const cycleClass = getCycleClass(asm.cycles || 0);
-                html += `<div class="asm-line ${{profileClass}}" tabindex="0">`;
-                html += `<span class="addr">${{asm.addr}}</span>`;
-                if (HAS_PROFILE) {{
-                    html += `<span class="cycles ${{cycleClass}}">${{formatCycles(asm.cycles || 0)}}</span>`;
-                }}
-                html += `<span class="hex">${{asm.hex}}</span>`;
-                html += `<span class="instr">${{escapeHtml(asm.instr)}}</span>`;
-                html += `</div>`;
-            }}
-            html += `</div></div>`;
-        }}
-
-        // Render sorted source blocks
-        for (let i = 0; i < sortedBlocks.length; i++) {{
-            const block = sortedBlocks[i];
-            const blockId = `${{func.addr}}-${{block.line}}`;
-            const hasAsm = block.asm.length > 0;
-            const expanded = expandAll ? '' : 'collapsed';
-
-            // Calculate total cycles for this source block
-            const blockCycles = block.asm.reduce((sum, a) => sum + (a.cycles || 0), 0);
-
-            html += `<div class="block">`;
-
-            // Source line (section header style)
-            const toggleIcon = hasAsm ? (expandAll ? '&#9662;' : '&#9656;') : '';
-            const profileClass = HAS_PROFILE ? 'has-profile' : '';
-            const cycleClass = getCycleClass(blockCycles);
-            html += `<div class="source-line ${{profileClass}}" onclick="toggleBlock('${{blockId}}')" tabindex="0">`;
-            html += `<span class="toggle">${{toggleIcon}}</span>`;
-            if (HAS_PROFILE) {{
-                html += `<span class="cycles ${{cycleClass}}">${{formatCycles(blockCycles)}}</span>`;
-            }}
-            html += `<span class="line-num">${{block.line}}</span>`;
-            html += `<span class="code">${{escapeHtml(block.src || '')}}</span>`;
-            html += `</div>`;
-
-            // Assembly lines (grid layout)
-            if (hasAsm) {{
-                html += `<div class="asm-group ${{expanded}}" id="${{blockId}}">`;
-                for (const asm of block.asm) {{
-                    const cycleClass = getCycleClass(asm.cycles || 0);
-                    html += `<div class="asm-line ${{profileClass}}" tabindex="0">`;
-                    html += `<span class="addr">${{asm.addr}}</span>`;
-                    if (HAS_PROFILE) {{
-                        html += `<span class="cycles ${{cycleClass}}">${{formatCycles(asm.cycles || 0)}}</span>`;
-                    }}
-                    html += `<span class="hex">${{asm.hex}}</span>`;
-                    html += `<span class="instr">${{escapeHtml(asm.instr)}}</span>`;
-                    html += `</div>`;
-                }}
-                html += `</div>`;
-            }}
-
-            html += `</div>`;
-        }}
-        html += `</div>`;
-    }}
-    return html;
-}}
-
-function renderMachineView() {{
-    let html = '';
-    for (const func of FUNCTIONS) {{
-        html += `<div class="function">`;
-        html += `<div class="func-header"><span class="addr">${{func.addr}}</span>${{escapeHtml(func.name)}}</div>`;
-
-        for (let i = 0; i < func.blocks.length; i++) {{
-            const block = func.blocks[i];
-            const blockId = `m-${{func.addr}}-${{i}}`;
-            const hasSrc = block.src || block.line > 0;
-            const expanded = expandAll ? '' : 'collapsed';
-
-            html += `<div class="block asm-primary">`;
-
-            // Assembly block (clickable to show source)
-            if (block.asm.length > 0) {{
-                html += `<div class="asm-block" onclick="toggleBlock('${{blockId}}')">`;
-                for (const asm of block.asm) {{
-                    const profileClass = HAS_PROFILE ? 'has-profile' : '';
-                    const cycleClass = getCycleClass(asm.cycles || 0);
-                    html += `<div class="asm-line ${{profileClass}}">`;
-                    html += `<span class="addr">${{asm.addr}}</span>`;
-                    if (HAS_PROFILE) {{
-                        html += `<span class="cycles ${{cycleClass}}">${{formatCycles(asm.cycles || 0)}}</span>`;
-                    }}
-                    html += `<span class="hex">${{asm.hex}}</span>`;
-                    html += `<span class="instr">${{escapeHtml(asm.instr)}}</span>`;
-                    html += `</div>`;
-                }}
-                html += `</div>`;
-            }}
-
-            // Source context
-            if (hasSrc) {{
-                const blockCycles = block.asm.reduce((sum, a) => sum + (a.cycles || 0), 0);
-                const profileClass = HAS_PROFILE ? 'has-profile' : '';
-                const cycleClass = getCycleClass(blockCycles);
-                // Only show first line of source in machine view (multi-line blocks look messy)
-                const firstLine = (block.src || '').split('\\n')[0];
-                html += `<div class="source-group ${{expanded}}" id="${{blockId}}">`;
-                html += `<div class="source-line ${{profileClass}}">`;
-                html += `<span class="toggle"></span>`;  // Empty toggle to match grid columns
-                if (HAS_PROFILE) {{
-                    html += `<span class="cycles ${{cycleClass}}">${{formatCycles(blockCycles)}}</span>`;
-                }}
-                html += `<span class="line-num">${{block.file}}:${{block.line}}</span>`;
-                html += `<span class="code">${{escapeHtml(firstLine)}}</span>`;
-                html += `</div>`;
-                html += `</div>`;
-            }}
-
-            html += `</div>`;
-        }}
-        html += `</div>`;
-    }}
-    return html;
-}}
-
-function setView(view) {{
-    currentView = view;
-    document.getElementById('btn-source').classList.toggle('active', view === 'source');
-    document.getElementById('btn-machine').classList.toggle('active', view === 'machine');
-    render();
-}}
-
-function toggleBlock(id) {{
-    const el = document.getElementById(id);
-    if (el) {{
-        el.classList.toggle('collapsed');
-    }}
-}}
-
-function toggleExpandAll() {{
-    expandAll = document.getElementById('expand-all').checked;
-    render();
-}}
+    <script id="functions-data" type="application/json">'''
 
-function render() {{
-    const content = document.getElementById('content');
-    content.className = 'content view-' + currentView;
-    content.innerHTML = currentView === 'source' ? renderSourceView() : renderMachineView();
-}}
-
-function filterFiles() {{
-    const query = document.getElementById('search').value.toLowerCase();
-    document.querySelectorAll('#file-list a').forEach(link => {{
-        link.style.display = link.textContent.toLowerCase().includes(query) ? 'block' : 'none';
-    }});
-}}
-
-function toggleSidebar() {{
-    document.getElementById('sidebar').classList.toggle('open');
-    document.getElementById('sidebar-overlay').classList.toggle('open');
-}}
-
-// Initial render
-render();
+PAGE_TAIL_TEMPLATE = '''</script>
+    <script>
+const FUNCTIONS = JSON.parse(document.getElementById('functions-data').textContent);
+const INSTRUCTIONS = {instructions_json};
+const HAS_PROFILE = {has_profile};
+const TOTAL_CYCLES = {total_cycles};
     </script>
+    <script src="app.js"></script>
 </body>
 </html>
 '''
 
 
-def generate_index_html(all_files: list[str], binary_name: str) -> str:
-    """Generate the main index.html page."""
-    total_files = len([f for f in all_files if f != "_unknown_"])
+def generate_file_list_html(all_files: list[str]) -> str:
+    """Build the file list links from the sorted `all_files`.
 
+    The same markup is shared by the index and every per-file page; app.js
+    marks the current page's link client-side.
+    """
     file_items = []
-    for f in sorted(all_files):
+    for f in all_files:
         display = "(unknown)" if f == "_unknown_" else get_display_name(f)
         href = ("_unknown_" if f == "_unknown_" else get_display_name(f)) + ".html"
         file_items.append(f'<a href="{href}">{html.escape(display)}</a>')
+    return '\n'.join(file_items)
+
 
-    files_html = '\n'.join(file_items)
+def generate_html(out, filename: str, functions_json: list[str], instructions: list[str],
+                  sidebar_html: str, binary_name: str, profile: Optional[ProfileData] = None) -> None:
+    """Write HTML with dual-view support to the open file `out`.
+
+    `functions_json` holds the file's functions already encoded by AsmEncoder,
+    one string each, and is joined into the page's FUNCTIONS array;
+    `instructions` is that encoder's instruction table, HTML-escaped here
+    like the names and source text in FUNCTIONS.
+    """
+    display_name = get_display_name(filename) if filename != "_unknown_" else "(unknown source)"
+
+    # Profile data for JavaScript
+    has_profile_json = 'true' if profile else 'false'
+    total_cycles_json = str(profile.total_cycles) if profile else '0'
+
+    out.write(PAGE_HEAD_TEMPLATE.format(
+        display_name=html.escape(display_name),
+        sidebar_html=sidebar_html,
+        binary_name=html.escape(binary_name),
+    ))
+    out.write('[')
+    out.write(','.join(functions_json))
+    out.write(']')
+    out.write(PAGE_TAIL_TEMPLATE.format(
+        instructions_json=json.dumps([html.escape(instr, quote=False) for instr in instructions],
+                                     separators=(',', ':')),
+        has_profile=has_profile_json,
+        total_cycles=total_cycles_json,
+    ))
+
+
+def generate_index_html(all_files: list[str], files_html: str, binary_name: str) -> str:
+    """Generate the main index.html page."""
+    total_files = len([f for f in all_files if f != "_unknown_"])
 
     return f'''<!DOCTYPE html>
 <html lang="en">
@@ -1120,6 +1275,7 @@ def generate_index_html(all_files: list[str], binary_name: str) -> str:
             background: var(--bg-highlight);
             color: var(--text-primary);
         }}
+        .sidebar a.hidden {{ display: none; }}
         .search {{
             padding: 8px 12px;
             border-bottom: 1px solid var(--border-subtle);
@@ -1324,11 +1480,20 @@ def generate_index_html(all_files: list[str], binary_name: str) -> str:
         </div>
     </div>
     <script>
+        // Sidebar links with their lowercased names, for the filter
+        const fileLinks = Array.from(document.querySelectorAll('#file-list a'),
+                                     link => ({{ link, name: link.textContent.toLowerCase() }}));
+        let filterTimer = 0;
+
         function filterFiles(query) {{
-            query = query.toLowerCase();
-            document.querySelectorAll('#file-list a').forEach(link => {{
-                link.style.display = link.textContent.toLowerCase().includes(query) ? 'block' : 'none';
-            }});
+            // Debounced so a burst of keystrokes filters the list once
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => {{
+                query = query.toLowerCase();
+                for (const {{ link, name }} of fileLinks) {{
+                    link.classList.toggle('hidden', !name.includes(query));
+                }}
+            }}, 40);
         }}
 
         function toggleSidebar() {{
@@ -1341,65 +1506,123 @@ def generate_index_html(all_files: list[str], binary_name: str) -> str:
 '''
 
 
+def write_gzip_copy(path: str) -> None:
+    """Write a gzip-compressed copy of `path` next to it as `path`.gz.
+
+    Static servers can hand these out precompressed (e.g. nginx
+    gzip_static); browsing from file:// still uses the plain files.
+    """
+    with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Generate browsable disassembly HTML from objdump output')
     parser.add_argument('input_lst', help='Input .lst file from objdump -d -S')
     parser.add_argument('output_dir', help='Output directory for HTML files')
     parser.add_argument('--profile', '-p', help='Profile JSON file with per-address cycle counts')
+    parser.add_argument('--only', action='append', metavar='GLOB',
+                        help='Only generate pages for source files matching GLOB (repeatable)')
+    parser.add_argument('--skip', action='append', metavar='GLOB',
+                        help='Skip source files matching GLOB (repeatable)')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Also write a gzip-compressed .gz copy of every output file')
     args = parser.parse_args()
 
     input_file = args.input_lst
     output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
 
-    print(f"Parsing {input_file}...", file=sys.stderr)
-    files = parse_objdump(input_file)
-
-    # Filter out GCC library files (soft-float, etc.) - they're huge and not useful
-    library_patterns = ['lb1sf68', 'libgcc', 'crtbegin', 'crtend']
-    filtered_files = {}
-    for filepath, functions in files.items():
-        if any(pattern in filepath for pattern in library_patterns):
-            print(f"  Skipping library file: {filepath}", file=sys.stderr)
-            continue
-        filtered_files[filepath] = functions
-    files = filtered_files
-
-    print(f"Found {len(files)} source files", file=sys.stderr)
-
-    # Load profile data if provided
+    # Load profile data if provided; cycles are attached as functions are parsed
     profile: Optional[ProfileData] = None
     if args.profile:
         print(f"Loading profile from {args.profile}...", file=sys.stderr)
         profile = load_profile(args.profile)
         if profile:
             print(f"  {len(profile.address_cycles)} addresses, {profile.total_cycles:,} total cycles", file=sys.stderr)
-            annotate_with_profile(files, profile)
         else:
             print(f"  Warning: Failed to load profile", file=sys.stderr)
 
-    binary_name = os.path.basename(input_file).replace('.lst', '.elf')
-    all_files = list(files.keys())
+    # Filter out GCC library files (soft-float, etc.) - they're huge and not useful.
+    # --only/--skip globs match either the normalized path or its base name.
+    library_patterns = ['lb1sf68', 'libgcc', 'crtbegin', 'crtend']
+    decisions: dict[str, bool] = {}
+
+    def keep_file(filepath: str) -> bool:
+        keep = decisions.get(filepath)
+        if keep is None:
+            names = (filepath, os.path.basename(filepath))
+            if any(pattern in filepath for pattern in library_patterns):
+                print(f"  Skipping library file: {filepath}", file=sys.stderr)
+                keep = False
+            elif args.only and not any(fnmatch.fnmatch(name, glob) for name in names for glob in args.only):
+                keep = False
+            elif args.skip and any(fnmatch.fnmatch(name, glob) for name in names for glob in args.skip):
+                keep = False
+            else:
+                keep = True
+            decisions[filepath] = keep
+        return keep
+
+    # Each function is encoded to JSON as soon as the parser completes it and
+    # kept with its file's parts, then dropped. Pages are assembled from the
+    # parts at the end, once the full file list for the sidebar is known, so
+    # peak memory is the encoded JSON rather than the parsed objects. The parts
+    # stay in memory: a scratch file per source file would hold one descriptor
+    # each and run out on listings with more files than the fd limit.
+    print(f"Parsing {input_file}...", file=sys.stderr)
+    parts: dict[str, list[str]] = {}
+    encoders: dict[str, AsmEncoder] = {}  # one per file, for its instruction table
+    stats: dict[str, list[int]] = {}  # file -> [functions, blocks]
+    for filepath, func in parse_objdump(input_file, keep_file):
+        part = parts.get(filepath)
+        if part is None:
+            part = parts[filepath] = []
+            encoders[filepath] = AsmEncoder()
+            stats[filepath] = [0, 0]
+        if profile:
+            annotate_with_profile(func, profile)
+        part.append(encoders[filepath].encode(func))
+        file_stats = stats[filepath]
+        file_stats[0] += 1
+        file_stats[1] += len(func.source_blocks)
 
-    for filepath, functions in files.items():
+    print(f"Found {len(parts)} source files", file=sys.stderr)
+
+    binary_name = os.path.basename(input_file).replace('.lst', '.elf')
+    # Sorted once here; the sidebar and index list files in this order
+    all_files = sorted(parts)
+    files_html = generate_file_list_html(all_files)
+
+    for asset_name, asset in (("style.css", STYLE_CSS), ("app.js", APP_JS)):
+        asset_path = os.path.join(output_dir, asset_name)
+        with open(asset_path, 'w') as f:
+            f.write(asset)
+        if args.gzip:
+            write_gzip_copy(asset_path)
+
+    for filepath, part in parts.items():
         if filepath == "_unknown_":
             output_name = "_unknown_.html"
         else:
             output_name = get_display_name(filepath) + ".html"
 
         output_path = os.path.join(output_dir, output_name)
-        html_content = generate_html(filepath, functions, all_files, binary_name, profile)
-
-        with open(output_path, 'w') as f:
-            f.write(html_content)
+        with open(output_path, 'w', buffering=1 << 20) as f:
+            generate_html(f, filepath, part, list(encoders[filepath].instructions),
+                          files_html, binary_name, profile)
+        if args.gzip:
+            write_gzip_copy(output_path)
 
-        total_blocks = sum(len(func.source_blocks) for func in functions)
-        print(f"  {output_name}: {len(functions)} functions, {total_blocks} blocks", file=sys.stderr)
+        num_functions, total_blocks = stats[filepath]
+        print(f"  {output_name}: {num_functions} functions, {total_blocks} blocks", file=sys.stderr)
 
     index_path = os.path.join(output_dir, "index.html")
     with open(index_path, 'w') as f:
-        f.write(generate_index_html(all_files, binary_name))
+        f.write(generate_index_html(all_files, files_html, binary_name))
+    if args.gzip:
+        write_gzip_copy(index_path)
     print(f"  index.html", file=sys.stderr)
 
     print(f"Done! Output in {output_dir}/", file=sys.stderr)